@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# (bucket start, event, key)
+CounterKey = Tuple[datetime, str, str]
+
+
+class AnalyticsBuffer:
+    """Write-behind event counters.
+
+    ``record`` only bumps an in-memory counter, so it costs the request
+    nothing measurable. Every ``flush_seconds`` the counts are written with
+    a single unordered ``bulk_write`` of ``$inc`` upserts, one document per
+    (time bucket, event, key), and once more on shutdown. Counts from a
+    failed flush are kept for the next one.
+    """
+
+    def __init__(self, collection, flush_seconds: float = 10.0, bucket_seconds: int = 3600):
+        self.collection = collection
+        self.flush_seconds = flush_seconds
+        self.bucket_seconds = bucket_seconds
+        self.flushes = 0
+        self.flush_failures = 0
+        self.flushed_events = 0
+        self._counts: Dict[CounterKey, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def bucket(self, moment: datetime) -> datetime:
+        """Start of the bucket holding ``moment`` (naive UTC, like the rest of the data)"""
+        seconds = int((moment - EPOCH).total_seconds())
+        return EPOCH + timedelta(seconds=seconds - seconds % self.bucket_seconds)
+
+    def record(self, event: str, key: str = "", amount: int = 1):
+        counter = (self.bucket(datetime.utcnow()), event, key)
+        self._counts[counter] = self._counts.get(counter, 0) + amount
+
+    @property
+    def pending(self) -> int:
+        return sum(self._counts.values())
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    async def flush(self):
+        """Write out everything counted so far"""
+        if not self._counts:
+            return
+        counts, self._counts = self._counts, {}
+        try:
+            await self.collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"bucket": bucket, "event": event, "key": key},
+                        {"$inc": {"count": count}},
+                        upsert=True
+                    )
+                    for (bucket, event, key), count in counts.items()
+                ],
+                ordered=False
+            )
+        except Exception as e:
+            self.flush_failures += 1
+            logger.error(f"Error flushing analytics counters: {str(e)}")
+            # Keep the counts for the next attempt
+            for counter, count in counts.items():
+                self._counts[counter] = self._counts.get(counter, 0) + count
+            return
+        self.flushes += 1
+        self.flushed_events += sum(counts.values())
+
+    async def totals(self, since: datetime) -> Dict[str, Dict[str, int]]:
+        """Counts per event and key from ``since`` on, including unflushed ones"""
+        totals: Dict[str, Dict[str, int]] = {}
+        cursor = self.collection.aggregate([
+            {"$match": {"bucket": {"$gte": self.bucket(since)}}},
+            {"$group": {"_id": {"event": "$event", "key": "$key"}, "count": {"$sum": "$count"}}}
+        ])
+        async for row in cursor:
+            event, key = row["_id"]["event"], row["_id"]["key"]
+            totals.setdefault(event, {})[key] = row["count"]
+        for (bucket, event, key), count in self._counts.items():
+            if bucket >= self.bucket(since):
+                keys = totals.setdefault(event, {})
+                keys[key] = keys.get(key, 0) + count
+        return totals
+
+    def as_dict(self) -> dict:
+        return {
+            "pending": self.pending,
+            "flushes": self.flushes,
+            "flushFailures": self.flush_failures,
+            "flushedEvents": self.flushed_events
+        }
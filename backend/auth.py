@@ -1,11 +1,19 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import asyncio
+import hashlib
+import logging
+import time
 import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import os
 
+logger = logging.getLogger(__name__)
+
 # Secret key for JWT - in production, use environment variable
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
@@ -15,6 +23,42 @@ ACCESS_TOKEN_EXPIRE_HOURS = 24
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# bcrypt is deliberately slow, so it runs on a small dedicated pool instead of
+# the event loop; jobs beyond the pool plus the queue limit are refused
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "8"))
+hash_executor = ThreadPoolExecutor(
+    max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+
+class PasswordHashStats:
+    """Counters for the password hashing pool"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.run_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "workers": PASSWORD_HASH_WORKERS,
+            "maxQueue": PASSWORD_HASH_MAX_QUEUE,
+            "inFlight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avgWaitMs": round(self.wait_seconds / completed * 1000, 2),
+            "avgRunMs": round(self.run_seconds / completed * 1000, 2),
+            "maxRunMs": round(self.max_run_seconds * 1000, 2)
+        }
+
+
+password_hash_stats = PasswordHashStats()
+
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
@@ -26,6 +70,48 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def _run_hash_job(func, *args):
+    """Run a bcrypt call on the hashing pool, recording queue and run time"""
+    stats = password_hash_stats
+    if stats.in_flight >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        stats.rejected += 1
+        raise HTTPException(
+            status_code=503,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"}
+        )
+
+    submitted = time.perf_counter()
+    started = None
+
+    def job():
+        nonlocal started
+        started = time.perf_counter()
+        return func(*args)
+
+    stats.in_flight += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(hash_executor, job)
+    finally:
+        stats.in_flight -= 1
+        if started is not None:
+            finished = time.perf_counter()
+            stats.completed += 1
+            stats.wait_seconds += started - submitted
+            stats.run_seconds += finished - started
+            stats.max_run_seconds = max(stats.max_run_seconds, finished - started)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the hashing pool"""
+    return await _run_hash_job(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool"""
+    return await _run_hash_job(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -39,19 +125,181 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+class VerifiedTokenCache:
+    """Bounded LRU of tokens whose signature has already been verified.
+
+    Keyed by a SHA-256 of the token so raw tokens aren't kept in memory.
+    Entries expire with the token's ``exp``; revoked tokens are remembered
+    until they would have expired anyway. It is only touched from the event
+    loop (``get_current_user`` is async), so it needs no locking.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._revoked = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, digest: str) -> Optional[dict]:
+        payload = self._entries.get(digest)
+        if payload is None:
+            self.misses += 1
+            return None
+        if payload.get("exp", 0) <= time.time():
+            del self._entries[digest]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return payload
+
+    def put(self, digest: str, payload: dict):
+        self._entries[digest] = payload
+        self._entries.move_to_end(digest)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def is_revoked(self, digest: str) -> bool:
+        return digest in self._revoked
+
+    def revoke(self, digest: str, expires_at: float):
+        self._entries.pop(digest, None)
+        now = time.time()
+        self._revoked = {d: exp for d, exp in self._revoked.items() if exp > now}
+        self._revoked[digest] = expires_at
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxSize": self.max_entries,
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+token_cache = VerifiedTokenCache(int(os.getenv("TOKEN_CACHE_SIZE", "1024")))
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class TokenRevocations:
+    """Revoked tokens shared by every worker, one document per token digest.
+
+    Logout writes the digest to MongoDB and to this worker's ``token_cache``.
+    A background task copies revocations made by other workers into
+    ``token_cache`` every ``poll_seconds``, so checking a token never waits
+    on the database; a token revoked elsewhere keeps working here for at
+    most that long. A TTL index (see ``database.create_indexes``) removes
+    each document once its token would have expired anyway.
+    """
+
+    def __init__(self, poll_seconds: float = 5.0):
+        self.poll_seconds = poll_seconds
+        self.collection = None
+        self.sync_failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, collection):
+        self.collection = collection
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        failing = False
+        while True:
+            try:
+                await self.sync()
+                if failing:
+                    logger.info("Revoked token sync recovered")
+                    failing = False
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.sync_failures += 1
+                # Once per outage, not once per poll
+                if not failing:
+                    logger.error(f"Error syncing revoked tokens: {str(e)}")
+                    failing = True
+            await asyncio.sleep(self.poll_seconds)
+
+    async def sync(self):
+        """Copy every unexpired revocation into ``token_cache``"""
+        cursor = self.collection.find(
+            {"expiresAt": {"$gt": datetime.utcnow()}}, {"expiresAt": 1}
+        )
+        async for document in cursor:
+            if not token_cache.is_revoked(document["_id"]):
+                token_cache.revoke(
+                    document["_id"], (document["expiresAt"] - EPOCH).total_seconds()
+                )
+
+    async def revoke(self, digest: str, expires_at: float):
+        if self.collection is None:
+            return
+        await self.collection.update_one(
+            {"_id": digest},
+            {"$set": {"expiresAt": datetime.utcfromtimestamp(expires_at)}},
+            upsert=True
+        )
+
+
+token_revocations = TokenRevocations(float(os.getenv("TOKEN_REVOCATION_POLL_SECONDS", "5")))
+
+
 def decode_token(token: str) -> dict:
-    """Decode and verify a JWT token"""
+    """Decode and verify a JWT token, skipping verification for tokens seen before"""
+    digest = token_cache.digest(token)
+    if token_cache.is_revoked(digest):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    token_cache.put(digest, payload)
+    return payload
+
+
+async def revoke_token(token: str):
+    """Stop accepting a token on every worker before it expires"""
+    payload = decode_token(token)
+    digest = token_cache.digest(token)
+    expires_at = payload.get("exp", time.time())
+    # Shared first, so a failure leaves the token valid everywhere rather
+    # than revoked on this worker only
+    await token_revocations.revoke(digest, expires_at)
+    token_cache.revoke(digest, expires_at)
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)):
+    """Dependency to get current authenticated user.
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)):
-    """Dependency to get current authenticated user"""
+    Async so it runs on the event loop rather than the threadpool, which is
+    what keeps ``token_cache`` single-threaded. Revocations from other
+    workers reach ``token_cache`` through ``token_revocations``, so a cached
+    token is checked without touching MongoDB.
+    """
     token = credentials.credentials
     payload = decode_token(token)
     username = payload.get("sub")
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Offline load test for the portfolio API.
+
+Boots ``server:app`` in-process against a local MongoDB stand-in
+(mongomock-motor, or a real server with --mongo-url), drives it concurrently
+with httpx and reports throughput and latency percentiles per endpoint.
+
+Run from the backend directory:
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.loadtest --output baseline.json
+    # ... later, on the same machine ...
+    python -m benchmarks.loadtest --output current.json --baseline baseline.json
+
+With --baseline the run fails (exit code 1) if any scenario's p95 latency
+regressed by more than --tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "admin123"
+
+# A tiny but valid-looking PDF; the server only sniffs the leading bytes
+SAMPLE_PDF = b"%PDF-1.4\n" + b"0" * 64 * 1024 + b"\n%%EOF\n"
+
+
+def configure_environment(args):
+    """Settings the app reads at import time"""
+    os.environ.setdefault("MONGO_URL", args.mongo_url or "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "portfolio_benchmark")
+    scratch = tempfile.mkdtemp(prefix="portfolio-bench-")
+    os.environ.setdefault("UPLOAD_DIR", os.path.join(scratch, "uploads"))
+    os.environ.setdefault("STATIC_SNAPSHOT_DIR", os.path.join(scratch, "static"))
+    # The stand-in has no change streams; a real server may or may not
+    os.environ.setdefault("CACHE_SYNC_MODE", "auto" if args.mongo_url else "poll")
+    # Let the login scenario measure bcrypt rather than the throttle
+    for name in ("LOGIN_IP_BURST", "LOGIN_USERNAME_BURST"):
+        os.environ.setdefault(name, "1000000")
+    for name in ("LOGIN_IP_PER_MINUTE", "LOGIN_USERNAME_PER_MINUTE"):
+        os.environ.setdefault(name, "1000000")
+
+
+def patch_mongomock_bulk_sort():
+    """Let mongomock's bulk updates accept the ``sort`` argument newer
+    pymongo passes; without it every analytics flush fails.
+
+    mongomock has no release that accepts it yet, so the argument is dropped
+    (analytics upserts match on a unique key, where sort has no effect).
+    """
+    import inspect
+    from mongomock.collection import BulkOperationBuilder
+
+    add_update = BulkOperationBuilder.add_update
+    if "sort" in inspect.signature(add_update).parameters:
+        return
+
+    def add_update_without_sort(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    BulkOperationBuilder.add_update = add_update_without_sort
+    print("Note: this mongomock ignores the sort argument of bulk updates", file=sys.stderr)
+
+
+def use_mongo_stand_in():
+    """Point the database module at an in-memory mongomock-motor client.
+
+    Must run before ``server`` is imported, since modules copy the
+    collections out of ``database`` at import time.
+    """
+    from mongomock_motor import AsyncMongoMockClient
+    import database
+
+    patch_mongomock_bulk_sort()
+    database.client = AsyncMongoMockClient()
+    database.db = database.client[os.environ["DB_NAME"]]
+    database.portfolio_collection = database.db.portfolio
+    database.admin_collection = database.db.admin
+    database.documents_collection = database.db.documents
+    database.rate_limits_collection = database.db.rate_limits
+    database.analytics_collection = database.db.analytics
+    database.revoked_tokens_collection = database.db.revoked_tokens
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    total = len(latencies)
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput": round(total / elapsed, 2) if elapsed else 0.0,
+        "meanMs": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        "p50Ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95Ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99Ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "maxMs": round(latencies[-1] * 1000, 3) if latencies else 0.0
+    }
+
+
+async def run_scenario(client, make_request, requests, concurrency, ok_statuses=(200,)):
+    """Issue ``requests`` calls from ``concurrency`` workers"""
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in remaining:
+            start = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code not in ok_statuses:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run(args):
+    import httpx
+    import server
+
+    await server.startup_event()
+    try:
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            login = await client.post(
+                "/api/auth/login",
+                json={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}
+            )
+            login.raise_for_status()
+            auth = {"Authorization": f"Bearer {login.json()['token']}"}
+
+            upload = await client.post(
+                "/api/admin/documents/upload",
+                headers=auth,
+                files={"resumePDF": ("resume.pdf", SAMPLE_PDF, "application/pdf")}
+            )
+            upload.raise_for_status()
+
+            portfolio = await client.get("/api/portfolio")
+            portfolio.raise_for_status()
+            etag = portfolio.headers["etag"]
+            skill_id = portfolio.json()["skills"][0]["id"]
+            skill = dict(portfolio.json()["skills"][0])
+
+            async def update_skill(client, i):
+                return await client.put(
+                    f"/api/admin/portfolio/skill/{skill_id}",
+                    headers=auth,
+                    json={**skill, "level": 50 + i % 50}
+                )
+
+            async def upload_resume(client, i):
+                # Vary the content so every upload is a new object
+                content = SAMPLE_PDF + str(i).encode()
+                return await client.post(
+                    "/api/admin/documents/upload",
+                    headers=auth,
+                    files={"resumePDF": ("resume.pdf", content, "application/pdf")}
+                )
+
+            scenarios = {
+                "portfolio_read": (
+                    lambda c, i: c.get("/api/portfolio"), args.requests, (200,)
+                ),
+                "portfolio_read_gzip": (
+                    lambda c, i: c.get("/api/portfolio", headers={"Accept-Encoding": "gzip"}),
+                    args.requests, (200,)
+                ),
+                "portfolio_revalidate": (
+                    lambda c, i: c.get("/api/portfolio", headers={"If-None-Match": etag}),
+                    args.requests, (200, 304)
+                ),
+                "portfolio_section": (
+                    lambda c, i: c.get("/api/portfolio/skills"), args.requests, (200,)
+                ),
+                "document_download": (
+                    lambda c, i: c.get("/api/documents/download/resume-pdf", follow_redirects=True),
+                    args.requests, (200,)
+                ),
+                "document_range": (
+                    lambda c, i: c.get(
+                        "/api/documents/download/resume-pdf",
+                        headers={"Range": "bytes=0-1023"},
+                        follow_redirects=True
+                    ),
+                    args.requests, (206,)
+                ),
+                # bcrypt makes logins expensive by design; run fewer of them
+                "login": (
+                    lambda c, i: c.post(
+                        "/api/auth/login",
+                        json={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}
+                    ),
+                    max(args.requests // 20, 5), (200,)
+                ),
+                "mutation": (update_skill, max(args.requests // 5, 10), (200,)),
+                "upload": (upload_resume, max(args.requests // 10, 5), (200,))
+            }
+
+            selected = args.scenarios or list(scenarios)
+            results = {}
+            for name in selected:
+                make_request, requests, ok_statuses = scenarios[name]
+                # Warm caches and code paths before measuring
+                await make_request(client, -1)
+                results[name] = await run_scenario(
+                    client, make_request, requests, args.concurrency, ok_statuses
+                )
+                print(
+                    f"{name:24} {results[name]['throughput']:>10.1f} req/s  "
+                    f"p50 {results[name]['p50Ms']:>8.2f}ms  "
+                    f"p95 {results[name]['p95Ms']:>8.2f}ms  "
+                    f"p99 {results[name]['p99Ms']:>8.2f}ms  "
+                    f"errors {results[name]['errors']}"
+                )
+            return results
+    finally:
+        await server.shutdown_event()
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of scenarios whose p95 regressed beyond tolerance"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("p95Ms"):
+            continue
+        change = result["p95Ms"] / previous["p95Ms"] - 1
+        if change > tolerance or result["errors"] > previous.get("errors", 0):
+            regressions.append(
+                f"{name}: p95 {previous['p95Ms']}ms -> {result['p95Ms']}ms "
+                f"({change:+.0%}), errors {previous.get('errors', 0)} -> {result['errors']}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=500, help="requests per read scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--mongo-url", help="use a real MongoDB instead of mongomock-motor")
+    parser.add_argument("--scenario", dest="scenarios", action="append",
+                        help="run only this scenario (repeatable)")
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="compare against this results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative p95 regression (default 0.25)")
+    args = parser.parse_args()
+
+    configure_environment(args)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    if not args.mongo_url:
+        use_mongo_stand_in()
+
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "mongo": args.mongo_url and "server" or "mongomock",
+            "requests": args.requests,
+            "concurrency": args.concurrency
+        },
+        "results": results
+    }
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
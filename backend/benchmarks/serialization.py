@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Serialization microbenchmarks for the portfolio API.
+
+Times turning each endpoint's response payload into bytes two ways:
+
+* before: FastAPI's default path, jsonable_encoder followed by JSONResponse
+* after:  FastJSONResponse given the payload directly, as the snapshot
+          caches and /api/portfolio/changes do. Handlers that return plain
+          values still go through jsonable_encoder first, so for them this
+          is an upper bound.
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization
+"""
+
+import argparse
+import copy
+import os
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def build_payloads():
+    """Representative response bodies, keyed by endpoint"""
+    from bson import ObjectId
+    from database import default_portfolio
+    from models import Experience
+
+    portfolio = default_portfolio()
+    portfolio["updatedAt"] = datetime.utcnow()
+    # A portfolio that has been edited for a while is bigger than the seed
+    large_portfolio = copy.deepcopy(portfolio)
+    for section in ("experience", "certifications", "skills"):
+        items = large_portfolio[section]
+        large_portfolio[section] = [
+            {**item, "id": str(ObjectId())} for _ in range(10) for item in items
+        ]
+
+    experience = Experience(**{**portfolio["experience"][0], "id": None})
+    document = {
+        "filename": "resume.pdf",
+        "path": "/uploads/objects/ab/" + "ab" * 32,
+        "sha256": "ab" * 32,
+        "size": 65536,
+        "contentType": "application/pdf",
+        "uploadedAt": datetime.utcnow()
+    }
+    command = {
+        "count": 1200, "failures": 0, "totalMs": 845.2, "maxMs": 12.4,
+        "avgMs": 0.704, "documents": 1100, "replyBytes": 4_200_000
+    }
+
+    return {
+        "GET /api/portfolio": portfolio,
+        "GET /api/portfolio (10x sections)": large_portfolio,
+        "GET /api/portfolio/skills": portfolio["skills"],
+        # Built once per upload by documents_cache for the download endpoints
+        "documents snapshot": {
+            **{name: document for name in ("resumePDF", "resumeDOCX", "coverLetterPDF", "coverLetterDOCX")},
+            "updatedAt": datetime.utcnow()
+        },
+        "POST /api/admin/portfolio/experience": {
+            "success": True, "message": "Experience added successfully", "data": experience
+        },
+        "POST /api/admin/portfolio/batch": {
+            "success": True,
+            "message": f"Applied {len(large_portfolio['skills'])} of {len(large_portfolio['skills'])} operations",
+            "results": [
+                {"op": "update", "section": "skills", "id": item["id"], "success": True}
+                for item in large_portfolio["skills"]
+            ],
+            "version": 42,
+            "skills": large_portfolio["skills"]
+        },
+        "GET /api/admin/metrics": {
+            "passwordHashing": {"workers": 2, "inFlight": 0, "rejected": 0, "avgRunMs": 250.0},
+            "loginThrottle": {"allowed": 40, "rejected": 2},
+            "tokenCache": {"entries": 10, "hits": 900, "misses": 10, "hitRatio": 0.989},
+            "mongoPool": {"openConnections": 10, "checkedOut": 1, "checkouts": 5000},
+            "mongoCommands": {name: command for name in ("find", "update", "findAndModify", "insert")}
+        }
+    }
+
+
+def before(content) -> bytes:
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def after(content) -> bytes:
+    from responses import FastJSONResponse
+
+    return FastJSONResponse(content).body
+
+
+def measure(function, content, number: int) -> float:
+    """Best of five runs, in microseconds per call"""
+    timer = timeit.Timer(lambda: function(content))
+    return min(timer.repeat(repeat=5, number=number)) / number * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing run")
+    args = parser.parse_args()
+
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    payloads = build_payloads()
+
+    print(f"{'endpoint':40} {'bytes':>8} {'before µs':>10} {'after µs':>10} {'speedup':>8}")
+    for name, content in payloads.items():
+        size = len(after(content))
+        old = measure(before, content, args.number)
+        new = measure(after, content, args.number)
+        print(f"{name:40} {size:>8} {old:>10.1f} {new:>10.1f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import logging
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import pymongo
+from pymongo.errors import ConnectionFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling MongoDB while the circuit is open"""
+
+
+def is_outage(error: BaseException) -> bool:
+    """Whether an error means MongoDB is unreachable or too slow, as opposed
+    to a problem with the request itself"""
+    return isinstance(error, ConnectionFailure) or (
+        isinstance(error, PyMongoError) and error.timeout
+    )
+
+
+class CircuitBreaker:
+    """Fails MongoDB calls fast once the database looks down.
+
+    Each call runs under ``pymongo.timeout(timeout_seconds)``, which bounds
+    server selection and sets maxTimeMS on every command. After
+    ``failure_threshold`` consecutive outage errors the circuit opens and
+    calls raise CircuitOpenError immediately; after ``reset_seconds`` a
+    single trial call is let through (half-open) and its outcome closes or
+    re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        timeout_seconds: Optional[float] = None
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.timeout_seconds = timeout_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.rejected = 0
+        self.transitions = {state: 0 for state in STATES}
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    def _transition(self, state: str, reason: str = ""):
+        if state == self.state:
+            return
+        log = logger.info if state == CLOSED else logger.warning
+        log(f"{self.name} circuit {self.state} -> {state}{f': {reason}' if reason else ''}")
+        self.state = state
+        self.transitions[state] += 1
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+
+    def _before_call(self) -> bool:
+        """Return whether this call is the half-open trial, or raise if the
+        circuit is open"""
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self._transition(HALF_OPEN)
+        if self.state == CLOSED:
+            return False
+        if self.state == HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return True
+        self.rejected += 1
+        raise CircuitOpenError(f"{self.name} circuit is open")
+
+    async def call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        trial = self._before_call()
+        try:
+            if self.timeout_seconds:
+                with pymongo.timeout(self.timeout_seconds):
+                    result = await operation()
+            else:
+                result = await operation()
+        except Exception as e:
+            if is_outage(e):
+                self.failures += 1
+                if trial or self.failures >= self.failure_threshold:
+                    self._transition(OPEN, str(e))
+            elif trial:
+                # The database answered, so it is reachable
+                self.failures = 0
+                self._transition(CLOSED)
+            raise
+        else:
+            self.failures = 0
+            self._transition(CLOSED)
+            return result
+        finally:
+            if trial:
+                self._trial_running = False
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutiveFailures": self.failures,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions)
+        }
@@ -0,0 +1,271 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from breaker import CircuitBreaker
+from responses import dumps
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Content codings we can produce, in order of preference
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+# Compression runs on the event loop, on the first request for each view
+# after a change. Quality 5 takes ~0.1 ms on a 20 KB portfolio where 11 takes
+# ~25 ms, for a body only ~10% larger.
+BROTLI_QUALITY = 5
+
+
+class Snapshot:
+    """A cached document together with its ready-to-send JSON body"""
+
+    __slots__ = ("data", "body", "etag", "_encoded")
+
+    def __init__(self, data: dict):
+        self.data = data
+        self.body = dumps(data)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self._encoded = {}
+
+    def encoded(self, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """Return the body compressed with ``encoding``.
+
+        Each variant is compressed at most once per snapshot. Returns the
+        uncompressed body (and ``None``) when compression doesn't help.
+        """
+        if encoding is None:
+            return self.body, None
+
+        body = self._encoded.get(encoding)
+        if body is None:
+            if encoding == "br":
+                body = brotli.compress(self.body, quality=BROTLI_QUALITY)
+            else:
+                body = gzip.compress(self.body, compresslevel=9, mtime=0)
+            if len(body) >= len(self.body):
+                body = self.body
+            self._encoded[encoding] = body
+
+        if body is self.body:
+            return self.body, None
+        return body, encoding
+
+    def variant_etag(self, encoding: Optional[str]) -> str:
+        """ETag for a given content coding of the body"""
+        if encoding is None:
+            return self.etag
+        return f'{self.etag[:-1]}-{encoding}"'
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the preferred supported coding from an Accept-Encoding header"""
+    if not accept_encoding:
+        return None
+
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+
+    best, best_quality = None, 0.0
+    for coding in SUPPORTED_ENCODINGS:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class SnapshotCache:
+    """In-process snapshots of a single-document collection.
+
+    The first read of each view (the whole document, or a projection of it
+    identified by ``key``) loads it from MongoDB and serializes it once;
+    every following read is served from memory until a write calls
+    ``invalidate()``, which drops all views together. ``default_projection``
+    applies to loads that don't ask for a projection of their own, to keep
+    internal fields out of the cached views.
+
+    Loads go through ``breaker`` when one is given. Invalidated views are
+    kept as the last known good copies, which ``get(stale_on_error=True)``
+    returns when a load fails.
+    """
+
+    FULL = "full"
+
+    def __init__(
+        self,
+        collection,
+        name: str,
+        max_entries: int = 64,
+        default_projection: Optional[dict] = None,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.collection = collection
+        self.name = name
+        self.max_entries = max_entries
+        self.default_projection = default_projection
+        self.breaker = breaker
+        self.stale_served = 0
+        self._entries: "OrderedDict[Hashable, Snapshot]" = OrderedDict()
+        self._stale: "OrderedDict[Hashable, Snapshot]" = OrderedDict()
+        self._load_failures = 0
+        self._last_error: Optional[Exception] = None
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        # Newest version of the document this worker knows of, or None if
+        # it can't tell; other copies (the static render) are judged by it
+        self.version: Optional[int] = None
+        self._put_versions: Dict[Hashable, int] = {}
+        self._listeners: List[Callable[["SnapshotCache"], None]] = []
+
+    def add_listener(self, listener: Callable[["SnapshotCache"], None]):
+        """Call ``listener(cache)`` whenever the document changes"""
+        self._listeners.append(listener)
+
+    def cached(self, key: Hashable = FULL) -> Optional[Snapshot]:
+        """Return the snapshot for ``key`` only if it is already in memory"""
+        return self._entries.get(key)
+
+    async def get(
+        self,
+        key: Hashable = FULL,
+        projection: Optional[dict] = None,
+        select: Optional[Callable[[dict], Any]] = None,
+        stale_on_error: bool = False,
+    ) -> Optional[Snapshot]:
+        """Return the cached snapshot for ``key``, loading it on a miss.
+
+        ``projection`` is pushed down to MongoDB and ``select`` picks the
+        value to cache out of the projected document. With
+        ``stale_on_error``, a failed load returns the last known good
+        snapshot for ``key`` if there is one.
+        """
+        snapshot = self._entries.get(key)
+        if snapshot is not None:
+            self._entries.move_to_end(key)
+            return snapshot
+
+        failures = self._load_failures
+        async with self._lock:
+            # Another request may have loaded it while we were waiting
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                return snapshot
+
+            generation = self._generation
+            try:
+                if self._load_failures != failures:
+                    # A load failed while we waited; don't queue up behind
+                    # the same outage one timeout at a time
+                    raise self._last_error
+                document = await self._load(
+                    projection if projection is not None else self.default_projection
+                )
+            except Exception as e:
+                if self._load_failures == failures:
+                    self._load_failures += 1
+                    self._last_error = e
+                stale = self._stale.get(key) if stale_on_error else None
+                if stale is None:
+                    raise
+                self.stale_served += 1
+                logger.debug(f"Serving stale {self.name} snapshot: {str(e) or type(e).__name__}")
+                return stale
+            if document is None:
+                return None
+
+            document.pop('_id', None)
+            snapshot = Snapshot(select(document) if select else document)
+            # Don't store a document that was invalidated while loading
+            if generation == self._generation:
+                self._saw_version(document.get("version"))
+                self._entries[key] = snapshot
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return snapshot
+
+    async def _load(self, projection: Optional[dict]) -> Optional[dict]:
+        if self.breaker is None:
+            return await self.collection.find_one({}, projection)
+        return await self.breaker.call(lambda: self.collection.find_one({}, projection))
+
+    def put(self, data: dict, key: Hashable = FULL, version: Optional[int] = None) -> Optional[Snapshot]:
+        """Store a document we just wrote, e.g. the post-image of an update.
+
+        With ``version``, a document older than one already put under the
+        same key is ignored, so replies to concurrent writes arriving out of
+        order can't roll the cache back.
+        """
+        if version is not None:
+            if version <= self._put_versions.get(key, -1):
+                return None
+            self._put_versions[key] = version
+            self._saw_version(version)
+
+        data = {k: value for k, value in data.items() if k != "_id"}
+        snapshot = Snapshot(data)
+        self._entries[key] = snapshot
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return snapshot
+
+    def _saw_version(self, version: Optional[int]):
+        if version is not None and (self.version is None or version > self.version):
+            self.version = version
+
+    def invalidate(self, version: Optional[int] = None, changed: bool = True):
+        """Drop all snapshots so the next reads reload them.
+
+        ``version`` is the document's new version, if the caller knows it.
+        Pass ``changed=False`` when the document may well be unchanged (a
+        reconnect, a retry after an error), so listeners aren't told.
+        """
+        self._generation += 1
+        self.version = version
+        for key, snapshot in self._entries.items():
+            self._stale[key] = snapshot
+            self._stale.move_to_end(key)
+        while len(self._stale) > self.max_entries:
+            self._stale.popitem(last=False)
+        self._entries = OrderedDict()
+        logger.debug(f"{self.name} cache invalidated")
+        if not changed:
+            return
+        for listener in self._listeners:
+            try:
+                listener(self)
+            except Exception as e:
+                logger.error(f"Error in {self.name} cache listener: {str(e)}")
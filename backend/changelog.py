@@ -0,0 +1,33 @@
+# Every write bumps the portfolio's version by one per change and appends
+# the changes to a capped log in the same update, so the entries are always
+# versions version - len(changeLog) + 1 ... version
+
+
+def change_log_update(changes: list, size: int) -> dict:
+    """Update operators recording ``changes`` in a log of ``size`` entries,
+    to merge into a write"""
+    return {
+        "$inc": {"version": len(changes)},
+        "$push": {"changeLog": {"$each": changes, "$slice": -size}}
+    }
+
+
+def changes_since(version: int, change_log: list, since: int) -> dict:
+    """The changes made after version ``since``, each tagged with the
+    version it produced.
+
+    ``resync`` is true when the log no longer holds all of them, or when
+    ``since`` is ahead of ``version``, and the client must reload instead.
+    """
+    first = version - len(change_log) + 1
+    if since > version or since < first - 1:
+        return {"version": version, "resync": True, "changes": []}
+    return {
+        "version": version,
+        "resync": False,
+        "changes": [
+            {"version": first + index, **change}
+            for index, change in enumerate(change_log)
+            if first + index > since
+        ]
+    }
@@ -1,8 +1,11 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+import asyncio
 import os
 from dotenv import load_dotenv
 from pathlib import Path
-from auth import hash_password
+from auth import hash_password_async
+from monitoring import pool_stats, command_stats
 from datetime import datetime
 import logging
 import ssl
@@ -14,6 +17,17 @@ logger = logging.getLogger(__name__)
 
 # MongoDB connection with SSL context
 mongo_url = os.environ['MONGO_URL']
+
+# Connection pool tuning; unset values keep pymongo's defaults
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+pool_options = {"minPoolSize": MONGO_MIN_POOL_SIZE}
+for option, env_name in (
+    ("maxPoolSize", "MONGO_MAX_POOL_SIZE"),
+    ("maxIdleTimeMS", "MONGO_MAX_IDLE_TIME_MS"),
+    ("waitQueueTimeoutMS", "MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+):
+    if os.getenv(env_name):
+        pool_options[option] = int(os.environ[env_name])
 try:
     # Create SSL context that allows all certificates
     ssl_context = ssl.create_default_context()
@@ -24,138 +38,209 @@ try:
         mongo_url,
         ssl=True,
         tlsAllowInvalidCertificates=True,
-        serverSelectionTimeoutMS=30000
+        serverSelectionTimeoutMS=int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000")),
+        event_listeners=[pool_stats, command_stats],
+        **pool_options
     )
     db = client[os.environ['DB_NAME']]
     logger.info("MongoDB connection established")
 except Exception as e:
     logger.error(f"Failed to connect to MongoDB: {str(e)}")
     # Fallback to simple connection
-    client = AsyncIOMotorClient(mongo_url)
+    client = AsyncIOMotorClient(mongo_url, event_listeners=[pool_stats, command_stats], **pool_options)
     db = client[os.environ['DB_NAME']]
 
 # Collections
 portfolio_collection = db.portfolio
 admin_collection = db.admin
 documents_collection = db.documents
+rate_limits_collection = db.rate_limits
+analytics_collection = db.analytics
+revoked_tokens_collection = db.revoked_tokens
 
 
-async def init_database():
-    """Initialize database with default admin and portfolio data"""
+async def warm_up_pool():
+    """Open the minimum pool up front so early requests don't pay for it"""
+    count = max(MONGO_MIN_POOL_SIZE, 1)
     try:
-        # Check if admin exists
-        admin_exists = await admin_collection.find_one({"username": "admin"})
-        if not admin_exists:
-            # Create default admin
-            hashed_password = hash_password("admin123")
-            await admin_collection.insert_one({
-                "username": "admin",
-                "password": hashed_password,
-                "createdAt": datetime.utcnow()
-            })
-            logger.info("Default admin user created")
-        
-        # Check if portfolio exists
-        portfolio_exists = await portfolio_collection.find_one({})
-        if not portfolio_exists:
-            # Create default portfolio data
-            default_portfolio = {
-                "personalInfo": {
-                    "name": "Rajesh Kumar",
-                    "jobTitle": "Senior Analyst at Capgemini",
-                    "profilePicture": "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=400&h=400&fit=crop",
-                    "coverPhoto": "https://images.unsplash.com/photo-1497366216548-37526070297c?w=1920&h=600&fit=crop",
-                    "aboutMe": "Results-driven Senior Analyst with 5+ years of experience in business analysis, data analytics, and project management. Specialized in delivering data-driven insights and strategic solutions for Fortune 500 clients. Passionate about leveraging technology to solve complex business challenges.",
-                    "email": "rajesh.kumar@email.com",
-                    "phone": "+91 98765 43210",
-                    "location": "Mumbai, India"
-                },
-                "experience": [
-                    {
-                        "id": "1",
-                        "company": "Capgemini",
-                        "position": "Senior Analyst",
-                        "startDate": "Jan 2021",
-                        "endDate": "Present",
-                        "isCurrent": True,
-                        "description": "Leading business analysis initiatives for global clients. Conducting data analysis, requirements gathering, and delivering strategic recommendations.",
-                        "responsibilities": [
-                            "Lead cross-functional teams in analyzing business requirements",
-                            "Develop data-driven insights using SQL, Python, and Tableau",
-                            "Manage stakeholder communications and project deliverables"
-                        ]
-                    },
-                    {
-                        "id": "2",
-                        "company": "Accenture",
-                        "position": "Business Analyst",
-                        "startDate": "Jun 2019",
-                        "endDate": "Dec 2020",
-                        "isCurrent": False,
-                        "description": "Performed business analysis and process optimization for financial services clients.",
-                        "responsibilities": [
-                            "Conducted gap analysis and process mapping",
-                            "Created business requirement documents (BRD)",
-                            "Collaborated with development teams for solution implementation"
-                        ]
-                    }
-                ],
-                "certifications": [
-                    {
-                        "id": "1",
-                        "name": "Certified Business Analysis Professional (CBAP)",
-                        "issuingOrg": "IIBA",
-                        "issueDate": "March 2022",
-                        "credentialId": "CBAP-2022-45678"
-                    },
-                    {
-                        "id": "2",
-                        "name": "Microsoft Certified: Azure Data Fundamentals",
-                        "issuingOrg": "Microsoft",
-                        "issueDate": "September 2021",
-                        "credentialId": "AZ-900-123456"
-                    },
-                    {
-                        "id": "3",
-                        "name": "Agile Certified Practitioner (PMI-ACP)",
-                        "issuingOrg": "PMI",
-                        "issueDate": "January 2021",
-                        "credentialId": "PMI-ACP-789012"
-                    }
-                ],
-                "skills": [
-                    {"id": "1", "name": "Business Analysis", "level": 90},
-                    {"id": "2", "name": "Data Analytics", "level": 85},
-                    {"id": "3", "name": "SQL & Database Management", "level": 80},
-                    {"id": "4", "name": "Python", "level": 75},
-                    {"id": "5", "name": "Tableau & Power BI", "level": 85},
-                    {"id": "6", "name": "Project Management", "level": 80},
-                    {"id": "7", "name": "Stakeholder Management", "level": 90},
-                    {"id": "8", "name": "Agile Methodologies", "level": 85}
-                ],
-                "socialLinks": {
-                    "linkedin": "https://linkedin.com/in/rajeshkumar",
-                    "instagram": "https://instagram.com/rajeshkumar",
-                    "facebook": "https://facebook.com/rajeshkumar",
-                    "twitter": "https://twitter.com/rajeshkumar"
-                },
-                "updatedAt": datetime.utcnow()
+        # Concurrent pings each need their own connection
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(count)))
+        logger.info(f"MongoDB pool warmed up: {pool_stats.as_dict()['openConnections']} connections")
+    except Exception as e:
+        logger.error(f"Error warming up MongoDB pool: {str(e)}")
+
+
+async def create_indexes():
+    """Create the indexes the API's queries rely on (no-op if they exist)"""
+    results = await asyncio.gather(
+        admin_collection.create_index("username", unique=True),
+        portfolio_collection.create_index("experience.id"),
+        portfolio_collection.create_index("certifications.id"),
+        portfolio_collection.create_index("skills.id"),
+        analytics_collection.create_index(
+            [("bucket", 1), ("event", 1), ("key", 1)], unique=True
+        ),
+        # Drop revoked tokens once they would have expired anyway
+        revoked_tokens_collection.create_index("expiresAt", expireAfterSeconds=0),
+        # Drop login buckets once they would be full again
+        rate_limits_collection.create_index("expiresAt", expireAfterSeconds=0),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error(f"Error creating index: {str(result)}")
+
+
+def default_portfolio() -> dict:
+    """Portfolio data seeded into an empty database"""
+    return {
+        "personalInfo": {
+            "name": "Rajesh Kumar",
+            "jobTitle": "Senior Analyst at Capgemini",
+            "profilePicture": "https://images.unsplash.com/photo-1507003211169-0a1dd7228f2d?w=400&h=400&fit=crop",
+            "coverPhoto": "https://images.unsplash.com/photo-1497366216548-37526070297c?w=1920&h=600&fit=crop",
+            "aboutMe": "Results-driven Senior Analyst with 5+ years of experience in business analysis, data analytics, and project management. Specialized in delivering data-driven insights and strategic solutions for Fortune 500 clients. Passionate about leveraging technology to solve complex business challenges.",
+            "email": "rajesh.kumar@email.com",
+            "phone": "+91 98765 43210",
+            "location": "Mumbai, India"
+        },
+        "experience": [
+            {
+                "id": "1",
+                "company": "Capgemini",
+                "position": "Senior Analyst",
+                "startDate": "Jan 2021",
+                "endDate": "Present",
+                "isCurrent": True,
+                "description": "Leading business analysis initiatives for global clients. Conducting data analysis, requirements gathering, and delivering strategic recommendations.",
+                "responsibilities": [
+                    "Lead cross-functional teams in analyzing business requirements",
+                    "Develop data-driven insights using SQL, Python, and Tableau",
+                    "Manage stakeholder communications and project deliverables"
+                ]
+            },
+            {
+                "id": "2",
+                "company": "Accenture",
+                "position": "Business Analyst",
+                "startDate": "Jun 2019",
+                "endDate": "Dec 2020",
+                "isCurrent": False,
+                "description": "Performed business analysis and process optimization for financial services clients.",
+                "responsibilities": [
+                    "Conducted gap analysis and process mapping",
+                    "Created business requirement documents (BRD)",
+                    "Collaborated with development teams for solution implementation"
+                ]
             }
-            await portfolio_collection.insert_one(default_portfolio)
-            logger.info("Default portfolio data created")
+        ],
+        "certifications": [
+            {
+                "id": "1",
+                "name": "Certified Business Analysis Professional (CBAP)",
+                "issuingOrg": "IIBA",
+                "issueDate": "March 2022",
+                "credentialId": "CBAP-2022-45678"
+            },
+            {
+                "id": "2",
+                "name": "Microsoft Certified: Azure Data Fundamentals",
+                "issuingOrg": "Microsoft",
+                "issueDate": "September 2021",
+                "credentialId": "AZ-900-123456"
+            },
+            {
+                "id": "3",
+                "name": "Agile Certified Practitioner (PMI-ACP)",
+                "issuingOrg": "PMI",
+                "issueDate": "January 2021",
+                "credentialId": "PMI-ACP-789012"
+            }
+        ],
+        "skills": [
+            {"id": "1", "name": "Business Analysis", "level": 90},
+            {"id": "2", "name": "Data Analytics", "level": 85},
+            {"id": "3", "name": "SQL & Database Management", "level": 80},
+            {"id": "4", "name": "Python", "level": 75},
+            {"id": "5", "name": "Tableau & Power BI", "level": 85},
+            {"id": "6", "name": "Project Management", "level": 80},
+            {"id": "7", "name": "Stakeholder Management", "level": 90},
+            {"id": "8", "name": "Agile Methodologies", "level": 85}
+        ],
+        "socialLinks": {
+            "linkedin": "https://linkedin.com/in/rajeshkumar",
+            "instagram": "https://instagram.com/rajeshkumar",
+            "facebook": "https://facebook.com/rajeshkumar",
+            "twitter": "https://twitter.com/rajeshkumar"
+        },
+        "updatedAt": datetime.utcnow(),
+        # Bumped by every admin write
+        "version": 0
+    }
+
+
+async def seed_admin():
+    """Create the default admin unless one exists"""
+    if await admin_collection.find_one({"username": "admin"}, {"_id": 1}):
+        return
+    
+    hashed_password = await hash_password_async("admin123")
+    try:
+        # The unique username index makes this safe against other workers
+        result = await admin_collection.update_one(
+            {"username": "admin"},
+            {
+                "$setOnInsert": {
+                    "username": "admin",
+                    "password": hashed_password,
+                    "createdAt": datetime.utcnow()
+                }
+            },
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return
+    if result.upserted_id is not None:
+        logger.info("Default admin user created")
+
+
+async def seed_singleton(collection, document_id: str, document: dict):
+    """Insert ``document`` into ``collection`` unless it already has one.
+
+    The fixed ``_id`` means concurrently booting workers can't both insert:
+    the loser gets a duplicate key error, which is ignored.
+    """
+    try:
+        result = await collection.update_one(
+            {},
+            {"$setOnInsert": {"_id": document_id, **document}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return
+    if result.upserted_id is not None:
+        logger.info(f"Default {document_id} data created")
+
+
+async def init_database():
+    """Initialize database indexes and default admin, portfolio and documents data"""
+    try:
+        await create_indexes()
         
-        # Check if documents collection exists
-        documents_exists = await documents_collection.find_one({})
-        if not documents_exists:
-            # Create empty documents record
-            default_documents = {
+        results = await asyncio.gather(
+            seed_admin(),
+            seed_singleton(portfolio_collection, "portfolio", default_portfolio()),
+            seed_singleton(documents_collection, "documents", {
                 "resumePDF": {"filename": "", "path": "", "uploadedAt": None},
                 "resumeDOCX": {"filename": "", "path": "", "uploadedAt": None},
                 "coverLetterPDF": {"filename": "", "path": "", "uploadedAt": None},
                 "coverLetterDOCX": {"filename": "", "path": "", "uploadedAt": None}
-            }
-            await documents_collection.insert_one(default_documents)
-            logger.info("Documents collection initialized")
+            }),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error seeding database: {str(result)}")
             
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
@@ -0,0 +1,170 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from cache import etag_matches
+
+MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+}
+
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+
+def http_date(value: datetime) -> str:
+    """Format a datetime (naive values are UTC) as an HTTP date"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an HTTP date header, returning None if it is missing or invalid"""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range ``bytes=`` header into inclusive (start, end).
+
+    Returns None when the header should be ignored (other units, multiple
+    ranges, malformed) and raises ValueError when it is unsatisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start, sep, end = (part.strip() for part in spec.partition("-"))
+    if not sep or not (start or end):
+        return None
+    if (start and not start.isdigit()) or (end and not end.isdigit()):
+        return None
+
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0 or size == 0:
+            raise ValueError("Unsatisfiable suffix range")
+        return max(size - length, 0), size - 1
+
+    first = int(start)
+    last = int(end) if end else size - 1
+    if end and first > last:
+        return None
+    if first >= size:
+        raise ValueError("Range starts past the end of the file")
+    return first, min(last, size - 1)
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted == filename:
+        return f'attachment; filename="{filename}"'
+    return f"attachment; filename*=utf-8''{quoted}"
+
+
+async def iter_file(file, start: int, length: int):
+    async with file:
+        await file.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await file.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def file_response(
+    request: Request,
+    path: Path,
+    filename: str,
+    media_type: str,
+    size: int,
+    etag: str,
+    last_modified: datetime,
+    cache_control: str = REVALIDATE_CACHE_CONTROL
+) -> Response:
+    """Serve a file with conditional GET and single byte-range support.
+
+    The file is opened before the response starts, so a missing file is a
+    404 rather than a 200 with an empty body.
+    """
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": content_disposition(filename)
+    }
+
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    else:
+        since = parse_http_date(request.headers.get("if-modified-since"))
+        modified = last_modified.replace(microsecond=0)
+        if modified.tzinfo is None:
+            modified = modified.replace(tzinfo=timezone.utc)
+        if since is not None and modified <= since:
+            return Response(status_code=304, headers=headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header and _if_range_matches(request.headers.get("if-range"), etag, last_modified):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=headers)
+
+    status_code = 200
+    start, length = 0, size
+    if byte_range is not None:
+        start, end = byte_range
+        length = end - start + 1
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+
+    try:
+        file = await anyio.open_file(path, "rb")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found on server")
+
+    return StreamingResponse(
+        iter_file(file, start, length),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+def _if_range_matches(if_range: Optional[str], etag: str, last_modified: datetime) -> bool:
+    """A Range is honoured only if If-Range is absent or still current"""
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # If-Range requires a strong comparison
+        return not if_range.startswith("W/") and if_range == etag
+    since = parse_http_date(if_range)
+    return since is not None and http_date(last_modified) == http_date(since)
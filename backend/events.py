@@ -0,0 +1,143 @@
+import asyncio
+import logging
+from collections import deque
+from typing import AsyncIterator, Dict, Optional, Set
+
+from responses import dumps
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT = b": ping\n\n"
+
+
+def format_event(event: str, data: dict) -> bytes:
+    """Encode one Server-Sent Event"""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class Subscriber:
+    """One connected client: a bounded backlog of encoded events"""
+
+    __slots__ = ("_pending", "_wakeup", "closed")
+
+    def __init__(self):
+        self._pending = deque()
+        self._wakeup = asyncio.Event()
+        self.closed = False
+
+    def _push(self, message: bytes):
+        self._pending.append(message)
+        self._wakeup.set()
+
+    def _close(self):
+        self.closed = True
+        self._pending.clear()
+        self._wakeup.set()
+
+    async def messages(self) -> AsyncIterator[bytes]:
+        """Yield messages as they arrive until the hub closes this client"""
+        while not self.closed:
+            if self._pending:
+                yield self._pending.popleft()
+                continue
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+
+class EventHub:
+    """Fans change notifications out to this worker's SSE clients.
+
+    Every client gets the same pre-encoded bytes, so an event costs one
+    serialization however many clients are connected, and an idle client
+    holds nothing but an empty deque. A client whose backlog reaches
+    ``queue_size`` isn't keeping up (or is gone) and is disconnected. A
+    single task sends heartbeats to everyone, which keeps proxies from
+    closing idle streams and flushes out dead connections. Notifications
+    for the same topic within ``coalesce_seconds`` are sent once.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 16,
+        heartbeat_seconds: float = 15.0,
+        coalesce_seconds: float = 0.25,
+        max_clients: int = 10000
+    ):
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self.coalesce_seconds = coalesce_seconds
+        self.max_clients = max_clients
+        self.published = 0
+        self.evicted = 0
+        self._subscribers: Set[Subscriber] = set()
+        self._scheduled: Dict[str, asyncio.TimerHandle] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    @property
+    def clients(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_clients
+
+    def start(self):
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop(self):
+        for handle in self._scheduled.values():
+            handle.cancel()
+        self._scheduled.clear()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+            self._heartbeat_task = None
+        # End every open stream so the server can shut down
+        for subscriber in self._subscribers:
+            subscriber._close()
+        self._subscribers.clear()
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber()
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def broadcast(self, message: bytes):
+        """Queue ``message`` for every client, dropping those that are behind"""
+        for subscriber in list(self._subscribers):
+            if len(subscriber._pending) >= self.queue_size:
+                self._subscribers.discard(subscriber)
+                subscriber._close()
+                self.evicted += 1
+                logger.info("Disconnected a slow event stream client")
+            else:
+                subscriber._push(message)
+
+    def notify(self, topic: str):
+        """Tell clients ``topic`` changed, once per coalescing window"""
+        if not self._subscribers or topic in self._scheduled:
+            return
+        self._scheduled[topic] = asyncio.get_running_loop().call_later(
+            self.coalesce_seconds, self._publish, topic
+        )
+
+    def _publish(self, topic: str):
+        self._scheduled.pop(topic, None)
+        self.published += 1
+        self.broadcast(format_event(topic, {"topic": topic}))
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            if self._subscribers:
+                self.broadcast(HEARTBEAT)
+
+    def as_dict(self) -> dict:
+        return {
+            "clients": self.clients,
+            "published": self.published,
+            "evicted": self.evicted
+        }
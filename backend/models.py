@@ -1,22 +1,23 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, PlainSerializer, PlainValidator, WithJsonSchema
+from typing import Annotated, List, Literal, Optional
 from datetime import datetime
 from bson import ObjectId
 
-class PyObjectId(ObjectId):
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
 
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid objectid")
-        return ObjectId(v)
+def validate_object_id(value) -> ObjectId:
+    if isinstance(value, ObjectId):
+        return value
+    if not ObjectId.is_valid(value):
+        raise ValueError("Invalid objectid")
+    return ObjectId(value)
 
-    @classmethod
-    def __modify_schema__(cls, field_schema):
-        field_schema.update(type="string")
+
+PyObjectId = Annotated[
+    ObjectId,
+    PlainValidator(validate_object_id),
+    PlainSerializer(str, return_type=str, when_used="json"),
+    WithJsonSchema({"type": "string"})
+]
 
 
 class PersonalInfo(BaseModel):
@@ -70,18 +71,12 @@ class Portfolio(BaseModel):
     socialLinks: SocialLinks
     updatedAt: Optional[datetime] = None
 
-    class Config:
-        json_encoders = {ObjectId: str}
-
 
 class Admin(BaseModel):
     username: str
     password: str
     createdAt: Optional[datetime] = Field(default_factory=datetime.utcnow)
 
-    class Config:
-        json_encoders = {ObjectId: str}
-
 
 class LoginRequest(BaseModel):
     username: str
@@ -96,6 +91,9 @@ class LoginResponse(BaseModel):
 class DocumentFile(BaseModel):
     filename: str = ""
     path: str = ""
+    sha256: Optional[str] = None
+    size: Optional[int] = None
+    contentType: Optional[str] = None
     uploadedAt: Optional[datetime] = None
 
 
@@ -105,5 +103,13 @@ class Documents(BaseModel):
     coverLetterPDF: Optional[DocumentFile] = DocumentFile()
     coverLetterDOCX: Optional[DocumentFile] = DocumentFile()
 
-    class Config:
-        json_encoders = {ObjectId: str}
+
+class PortfolioOperation(BaseModel):
+    op: Literal["set", "add", "update", "delete"]
+    section: Literal["personalInfo", "socialLinks", "experience", "certifications", "skills"]
+    id: Optional[str] = None
+    data: Optional[dict] = None
+
+
+class PortfolioBatch(BaseModel):
+    operations: List[PortfolioOperation] = Field(..., min_length=1, max_length=500)
@@ -0,0 +1,241 @@
+import asyncio
+import contextvars
+import logging
+import os
+import threading
+from contextvars import ContextVar
+from typing import Coroutine, Optional
+
+import bson
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Commands slower than this are logged with the request that issued them
+MONGO_SLOW_COMMAND_MS = float(os.getenv("MONGO_SLOW_COMMAND_MS", "100"))
+
+# Send each request's Mongo time to the client in a Server-Timing header.
+# Off by default: it tells anyone how long the database takes.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() in ("1", "true", "yes")
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection pool counters collected from pymongo's pool events.
+
+    pymongo calls these hooks from Motor's worker threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = {}
+        self.checkout_wait_seconds = 0.0
+        self.max_checkout_wait_seconds = 0.0
+        self.pool_clears = 0
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            checkouts = self.checkouts or 1
+            return {
+                "openConnections": self.open_connections,
+                "checkedOut": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkoutFailures": dict(self.checkout_failures),
+                "avgCheckoutWaitMs": round(self.checkout_wait_seconds / checkouts * 1000, 3),
+                "maxCheckoutWaitMs": round(self.max_checkout_wait_seconds * 1000, 3),
+                "poolClears": self.pool_clears
+            }
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+        logger.warning(f"MongoDB connection pool cleared for {event.address}")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures[event.reason] = self.checkout_failures.get(event.reason, 0) + 1
+
+    def connection_checked_out(self, event):
+        wait = event.duration or 0.0
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.checkout_wait_seconds += wait
+            self.max_checkout_wait_seconds = max(self.max_checkout_wait_seconds, wait)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+
+pool_stats = PoolStats()
+
+
+class RequestCommandStats:
+    """Mongo commands issued while handling one HTTP request"""
+
+    __slots__ = ("method", "path", "durations_ms")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        # list.append is atomic, so Motor's threads can record concurrently
+        self.durations_ms = []
+
+    @property
+    def count(self) -> int:
+        return len(self.durations_ms)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(self.durations_ms)
+
+
+# The request currently being handled; Motor copies the context into the
+# worker thread that runs each command, so listeners can see it
+current_request: ContextVar[Optional[RequestCommandStats]] = ContextVar(
+    "current_request", default=None
+)
+
+
+def start_background_task(coro: Coroutine) -> asyncio.Task:
+    """Start ``coro`` outside the current request's context.
+
+    ``create_task`` copies the caller's context, so a task started while
+    handling a request would have its Mongo commands charged to that
+    request long after it finished.
+    """
+    return contextvars.Context().run(asyncio.create_task, coro)
+
+
+def reply_document_count(reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        if batch is not None:
+            return len(batch)
+    if "value" in reply:
+        # findAndModify
+        return 0 if reply["value"] is None else 1
+    return reply.get("n", 0) if isinstance(reply.get("n"), int) else 0
+
+
+class CommandStats(monitoring.CommandListener):
+    """Per-command latency, result size and document counts.
+
+    Each command is attributed to the in-flight request, and anything
+    slower than MONGO_SLOW_COMMAND_MS is logged.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.commands = {}
+
+    def _record(self, name: str, duration_ms: float, documents: int, reply_bytes: int, failed: bool):
+        with self._lock:
+            stats = self.commands.get(name)
+            if stats is None:
+                stats = self.commands[name] = {
+                    "count": 0, "failures": 0, "totalMs": 0.0, "maxMs": 0.0,
+                    "documents": 0, "replyBytes": 0
+                }
+            stats["count"] += 1
+            stats["failures"] += failed
+            stats["totalMs"] += duration_ms
+            stats["maxMs"] = max(stats["maxMs"], duration_ms)
+            stats["documents"] += documents
+            stats["replyBytes"] += reply_bytes
+
+        request = current_request.get()
+        if request is not None:
+            request.durations_ms.append(duration_ms)
+        if duration_ms >= MONGO_SLOW_COMMAND_MS:
+            source = f" during {request.method} {request.path}" if request else ""
+            logger.warning(f"Slow MongoDB {name}: {duration_ms:.1f}ms{source}")
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                name: {
+                    **stats,
+                    "totalMs": round(stats["totalMs"], 3),
+                    "maxMs": round(stats["maxMs"], 3),
+                    "avgMs": round(stats["totalMs"] / stats["count"], 3)
+                }
+                for name, stats in self.commands.items()
+            }
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        reply = event.reply or {}
+        self._record(
+            event.command_name,
+            event.duration_micros / 1000,
+            reply_document_count(reply),
+            len(bson.encode(reply)) if reply else 0,
+            failed=False
+        )
+
+    def failed(self, event):
+        self._record(event.command_name, event.duration_micros / 1000, 0, 0, failed=True)
+
+
+command_stats = CommandStats()
+
+
+class CommandTimingMiddleware:
+    """Tracks the Mongo commands of each request and, with SERVER_TIMING
+    on, reports their total time to the client in a Server-Timing header"""
+
+    def __init__(self, app, server_timing: bool = SERVER_TIMING):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = RequestCommandStats(scope["method"], scope["path"])
+        token = current_request.set(request)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and self.server_timing:
+                timing = f'mongo;dur={request.total_ms:.1f};desc="{request.count} commands"'
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"server-timing", timing.encode())]
+                }
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
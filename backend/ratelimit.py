@@ -0,0 +1,176 @@
+import ipaddress
+import logging
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Optional, Union
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def parse_networks(value: str) -> List[Network]:
+    """Parse a comma-separated list of addresses and CIDR ranges"""
+    return [
+        ipaddress.ip_network(item.strip(), strict=False)
+        for item in value.split(",") if item.strip()
+    ]
+
+
+def _is_trusted(address: str, trusted: List[Network]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted)
+
+
+def client_ip(peer: Optional[str], forwarded_for: Optional[str], trusted: List[Network]) -> Optional[str]:
+    """The address of the client behind any trusted proxies.
+
+    Each proxy appends the address it received the request from to
+    X-Forwarded-For, so the header is read right to left and the first
+    address that isn't a trusted proxy is the client. The header is ignored
+    unless the peer itself is trusted, since clients can send anything.
+    """
+    if not peer or not forwarded_for or not _is_trusted(peer, trusted):
+        return peer
+    for address in reversed(forwarded_for.split(",")):
+        address = address.strip()
+        if address and not _is_trusted(address, trusted):
+            return address
+    return peer
+
+
+class TokenBucketBackend(ABC):
+    """Storage for token buckets.
+
+    ``consume`` takes one token from the bucket at ``key`` and returns 0 if
+    that was allowed, otherwise the number of seconds until a token frees up.
+    """
+
+    @abstractmethod
+    async def consume(self, key: str, capacity: float, refill_per_second: float) -> float:
+        ...
+
+
+class MemoryBucketBackend(TokenBucketBackend):
+    """Per-process buckets in a bounded LRU; the least recently used key is
+    evicted first, which only ever makes a bucket full again"""
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    async def consume(self, key: str, capacity: float, refill_per_second: float) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [capacity, now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            tokens, updated = bucket
+            bucket[0] = min(capacity, tokens + (now - updated) * refill_per_second)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / refill_per_second
+
+
+class MongoBucketBackend(TokenBucketBackend):
+    """Buckets shared by every worker, one document per key.
+
+    Refill and consume happen in a single atomic pipeline update, and a TTL
+    index (see ``database.create_indexes``) removes buckets once they would
+    be full again.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def consume(self, key: str, capacity: float, refill_per_second: float) -> float:
+        elapsed_seconds = {
+            "$divide": [
+                {"$subtract": ["$$NOW", {"$ifNull": ["$updatedAt", "$$NOW"]}]}, 1000
+            ]
+        }
+        refilled = {
+            "$min": [
+                capacity,
+                {
+                    "$add": [
+                        {"$ifNull": ["$tokens", capacity]},
+                        {"$multiply": [elapsed_seconds, refill_per_second]}
+                    ]
+                }
+            ]
+        }
+        bucket = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updatedAt": "$$NOW"}},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {
+                    "$set": {
+                        "tokens": {
+                            "$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]
+                        },
+                        "expiresAt": {
+                            "$add": ["$$NOW", math.ceil(capacity / refill_per_second * 1000)]
+                        }
+                    }
+                }
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if bucket["allowed"]:
+            return 0.0
+        return (1 - bucket["tokens"]) / refill_per_second
+
+
+class LoginThrottle:
+    """Token-bucket limits on login attempts per client IP and per username"""
+
+    def __init__(
+        self,
+        backend: TokenBucketBackend,
+        ip_burst: int,
+        ip_per_minute: float,
+        username_burst: int,
+        username_per_minute: float
+    ):
+        self.backend = backend
+        self.ip_limit = (ip_burst, ip_per_minute / 60)
+        self.username_limit = (username_burst, username_per_minute / 60)
+        self.allowed = 0
+        self.rejected = 0
+
+    async def check(self, client_ip: Optional[str], username: str):
+        """Raise 429 if this client or username is out of attempts"""
+        retry_after = max(
+            await self.backend.consume(f"ip:{client_ip or 'unknown'}", *self.ip_limit),
+            await self.backend.consume(f"user:{username.lower()}", *self.username_limit)
+        )
+        if retry_after > 0:
+            self.rejected += 1
+            logger.warning(f"Login throttled for {client_ip} / {username}")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many login attempts, please try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+        self.allowed += 1
+
+    def as_dict(self) -> dict:
+        return {"allowed": self.allowed, "rejected": self.rejected}
@@ -1,37 +1,64 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, Request, Query
+from fastapi.responses import Response, RedirectResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.security import HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from pymongo import ReturnDocument
+from pydantic import ValidationError
 import os
+import asyncio
+import copy
 import logging
 from pathlib import Path
+from urllib.parse import quote
 from typing import Optional
-from datetime import datetime, timedelta
-import shutil
+from datetime import datetime, timedelta, timezone
 
 from models import (
     LoginRequest, LoginResponse, PersonalInfo, SocialLinks,
-    Experience, Certification, Skill, Portfolio
+    Experience, Certification, Skill, Portfolio, PortfolioOperation, PortfolioBatch
 )
 from auth import (
-    verify_password, create_access_token, get_current_user, hash_password
+    verify_password_async, create_access_token, get_current_user, revoke_token,
+    security, password_hash_stats, token_cache, token_revocations
 )
 from database import (
     portfolio_collection, admin_collection, documents_collection,
-    init_database
+    rate_limits_collection, analytics_collection, revoked_tokens_collection,
+    init_database, warm_up_pool
+)
+from monitoring import pool_stats, command_stats, CommandTimingMiddleware
+from metrics import registry, PrometheusMiddleware
+from responses import FastJSONResponse
+from cache import SnapshotCache, etag_matches, choose_encoding
+from changelog import change_log_update, changes_since
+from breaker import CircuitBreaker, CircuitOpenError, is_outage, STATES as CIRCUIT_STATES
+from watcher import CacheWatcher
+from static_snapshot import StaticSnapshotPublisher
+from events import EventHub
+from analytics import AnalyticsBuffer
+from downloads import file_response, MEDIA_TYPES, IMMUTABLE_CACHE_CONTROL
+from storage import ContentStore, FileTooLarge, InvalidFileType
+from ratelimit import (
+    LoginThrottle, MemoryBucketBackend, MongoBucketBackend, client_ip, parse_networks
 )
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # Create uploads directory
-UPLOAD_DIR = ROOT_DIR / "uploads"
-UPLOAD_DIR.mkdir(exist_ok=True)
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", ROOT_DIR / "uploads"))
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 (UPLOAD_DIR / "resumes").mkdir(exist_ok=True)
 (UPLOAD_DIR / "cover-letters").mkdir(exist_ok=True)
 
+# Uploaded documents are stored by content hash
+content_store = ContentStore(UPLOAD_DIR / "objects")
+MAX_UPLOAD_SIZE = int(os.getenv("MAX_UPLOAD_SIZE_MB", "10")) * 1024 * 1024
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -43,6 +70,170 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Public reads fail fast while MongoDB is down instead of holding a worker
+# for the full server selection timeout
+mongo_breaker = CircuitBreaker(
+    "mongo",
+    failure_threshold=int(os.getenv("MONGO_BREAKER_FAILURES", "5")),
+    reset_seconds=float(os.getenv("MONGO_BREAKER_RESET_SECONDS", "30")),
+    timeout_seconds=int(os.getenv("MONGO_PUBLIC_TIMEOUT_MS", "2000")) / 1000
+)
+
+# In-memory snapshots; admin writes invalidate them locally and the watcher
+# keeps other workers in sync
+portfolio_cache = SnapshotCache(
+    portfolio_collection,
+    "portfolio",
+    default_projection={"changeLog": 0},
+    breaker=mongo_breaker
+)
+documents_cache = SnapshotCache(documents_collection, "documents", breaker=mongo_breaker)
+cache_watcher = CacheWatcher([portfolio_cache, documents_cache])
+
+# Live change notifications for SSE clients. Cache listeners hear about
+# every change, local or seen by the watcher, so they drive the events.
+event_hub = EventHub(
+    queue_size=int(os.getenv("SSE_QUEUE_SIZE", "16")),
+    heartbeat_seconds=float(os.getenv("SSE_HEARTBEAT_SECONDS", "15")),
+    max_clients=int(os.getenv("SSE_MAX_CLIENTS", "10000"))
+)
+for cache in (portfolio_cache, documents_cache):
+    cache.add_listener(lambda cache: event_hub.notify(cache.name))
+
+# Pre-rendered portfolio.json/index.html for a web server or CDN to serve,
+# refreshed after admin writes; set STATIC_SNAPSHOT_DIR empty to disable
+STATIC_SNAPSHOT_DIR = os.getenv("STATIC_SNAPSHOT_DIR", str(ROOT_DIR / "static"))
+static_snapshot = StaticSnapshotPublisher(
+    portfolio_cache,
+    Path(STATIC_SNAPSHOT_DIR) if STATIC_SNAPSHOT_DIR else None,
+    debounce_seconds=float(os.getenv("STATIC_SNAPSHOT_DEBOUNCE_SECONDS", "1"))
+)
+# Local writes and changes the watcher sees from other workers alike
+portfolio_cache.add_listener(lambda cache: static_snapshot.schedule())
+
+# Download and view counts, buffered in memory and written in batches
+analytics = AnalyticsBuffer(
+    analytics_collection,
+    flush_seconds=float(os.getenv("ANALYTICS_FLUSH_SECONDS", "10")),
+    bucket_seconds=int(os.getenv("ANALYTICS_BUCKET_SECONDS", "3600"))
+)
+
+# Login attempts are throttled per client IP and per username. The memory
+# backend is per worker; "mongo" shares the buckets across workers.
+if os.getenv("LOGIN_RATE_LIMIT_BACKEND", "memory").lower() == "mongo":
+    login_rate_limit_backend = MongoBucketBackend(rate_limits_collection)
+else:
+    login_rate_limit_backend = MemoryBucketBackend(
+        max_keys=int(os.getenv("LOGIN_RATE_LIMIT_MAX_KEYS", "10000"))
+    )
+login_throttle = LoginThrottle(
+    login_rate_limit_backend,
+    ip_burst=int(os.getenv("LOGIN_IP_BURST", "10")),
+    ip_per_minute=float(os.getenv("LOGIN_IP_PER_MINUTE", "10")),
+    username_burst=int(os.getenv("LOGIN_USERNAME_BURST", "5")),
+    username_per_minute=float(os.getenv("LOGIN_USERNAME_PER_MINUTE", "5"))
+)
+# Proxies whose X-Forwarded-For is believed when throttling by client IP;
+# without them every visitor behind a load balancer shares its address
+TRUSTED_PROXIES = parse_networks(os.getenv("TRUSTED_PROXIES", ""))
+
+# Fields a client may ask for with ?fields=, and the public section endpoints
+PORTFOLIO_FIELDS = (
+    "personalInfo", "experience", "certifications", "skills", "socialLinks", "updatedAt",
+    "version"
+)
+ARRAY_FIELDS = ("experience", "certifications", "skills")
+# Largest ?limit= accepted; each distinct limit is its own cache entry
+MAX_LIMIT = 100
+PORTFOLIO_SECTIONS = {
+    "personal-info": "personalInfo",
+    "experience": "experience",
+    "certifications": "certifications",
+    "skills": "skills",
+    "social-links": "socialLinks"
+}
+
+
+# Portfolio writes are recorded in a capped change log (see changelog.py)
+CHANGE_LOG_SIZE = int(os.getenv("PORTFOLIO_CHANGE_LOG_SIZE", "200"))
+CHANGES_VIEW = ("changes",)
+
+
+def portfolio_projection(fields, limit: Optional[int] = None) -> dict:
+    """Build a Mongo projection for the given fields, slicing arrays to limit"""
+    projection = {"_id": 0}
+    for field in fields:
+        if limit and field in ARRAY_FIELDS:
+            projection[field] = {"$slice": limit}
+        else:
+            projection[field] = 1
+    # A projection made only of $slice operators returns every other field
+    # as well, so include a small field to keep it an inclusion projection
+    if not any(value == 1 for value in projection.values()):
+        projection["updatedAt"] = 1
+    return projection
+
+
+def effective_limit(limit: Optional[int], fields=ARRAY_FIELDS) -> Optional[int]:
+    """``limit``, or None if it would cut none of ``fields`` in the cached
+    portfolio, so all such limits share the unlimited view's cache entry"""
+    if limit is None or not any(field in ARRAY_FIELDS for field in fields):
+        return None
+    snapshot = portfolio_cache.cached()
+    if snapshot is None:
+        return limit
+    longest = max(
+        (len(snapshot.data.get(field) or []) for field in fields if field in ARRAY_FIELDS),
+        default=0
+    )
+    return None if limit >= longest else limit
+
+
+def portfolio_changed(portfolio: Optional[dict] = None):
+    """Call after a successful portfolio write, with the updated document if
+    the write returned it"""
+    portfolio_cache.invalidate()
+    if portfolio is not None:
+        version = portfolio.get("version")
+        change_log = portfolio.pop("changeLog", [])
+        portfolio_cache.put(portfolio, version=version)
+        portfolio_cache.put(
+            {"version": version, "changeLog": change_log}, key=CHANGES_VIEW, version=version
+        )
+
+
+def read_error(error: Exception, message: str) -> HTTPException:
+    """Log a failed public read and return its error: 503 while MongoDB is
+    down, so clients and proxies retry later, and 500 otherwise.
+
+    Reads rejected by the open circuit are only logged at debug level; the
+    breaker already logs when it opens and closes.
+    """
+    log = logger.debug if isinstance(error, CircuitOpenError) else logger.error
+    log(f"{message}: {str(error)}")
+    if isinstance(error, CircuitOpenError) or is_outage(error):
+        return HTTPException(
+            status_code=503,
+            detail="Service temporarily unavailable",
+            headers={"Retry-After": str(max(1, round(mongo_breaker.reset_seconds)))}
+        )
+    return HTTPException(status_code=500, detail="Internal server error")
+
+
+def snapshot_response(request: Request, snapshot) -> Response:
+    """Send a cached snapshot, honouring Accept-Encoding and If-None-Match"""
+    body, encoding = snapshot.encoded(
+        choose_encoding(request.headers.get("accept-encoding"))
+    )
+    etag = snapshot.variant_etag(encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 # ===== PUBLIC ENDPOINTS =====
 
@@ -52,28 +243,157 @@ async def root():
 
 
 @api_router.get("/portfolio")
-async def get_portfolio():
-    """Get complete portfolio data"""
+async def get_portfolio(
+    request: Request,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT)
+):
+    """Get portfolio data, optionally only ?fields= with arrays cut to ?limit= items"""
     try:
-        portfolio = await portfolio_collection.find_one({})
-        if not portfolio:
+        limit = effective_limit(limit)
+        if not fields and not limit:
+            # Memory first, then a static render of the latest version this
+            # worker knows of, and only then MongoDB
+            snapshot = portfolio_cache.cached()
+            if snapshot is None and portfolio_cache.version is not None:
+                snapshot = static_snapshot.load(min_version=portfolio_cache.version)
+            if snapshot is None:
+                try:
+                    snapshot = await portfolio_cache.get(stale_on_error=True)
+                except Exception as e:
+                    # Stale content beats an error page
+                    snapshot = static_snapshot.load()
+                    if snapshot is None:
+                        raise
+                    log = logger.debug if isinstance(e, CircuitOpenError) else logger.warning
+                    log(f"Serving static portfolio snapshot, database failed: {str(e)}")
+        else:
+            requested = set(fields.split(",")) if fields else set(PORTFOLIO_FIELDS)
+            requested = {field.strip() for field in requested if field.strip()}
+            unknown = requested.difference(PORTFOLIO_FIELDS)
+            if unknown or not requested:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid fields: {', '.join(sorted(unknown)) or fields}"
+                )
+            
+            selected = tuple(field for field in PORTFOLIO_FIELDS if field in requested)
+            limit = effective_limit(limit, selected)
+            snapshot = await portfolio_cache.get(
+                ("fields", selected, limit),
+                projection=portfolio_projection(selected, limit),
+                select=lambda doc: {field: doc[field] for field in selected if field in doc},
+                stale_on_error=True
+            )
+        
+        if not snapshot:
             raise HTTPException(status_code=404, detail="Portfolio not found")
         
-        # Remove MongoDB _id field
-        portfolio.pop('_id', None)
-        return portfolio
+        analytics.record("portfolio_view")
+        return snapshot_response(request, snapshot)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching portfolio: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+        raise read_error(e, "Error fetching portfolio")
+
+
+@api_router.get("/portfolio/changes")
+async def get_portfolio_changes(since: int = Query(..., ge=0)):
+    """Changes made after version ?since=, to apply in order.
+
+    Each change is {version, op, section, id?, value?}: "set" replaces a
+    section, "add" appends an item, "update" replaces the item with that id
+    and "delete" removes it. If the changes since that version are no longer
+    in the log, ``resync`` is true and the client must reload the portfolio.
+    """
+    try:
+        snapshot = await portfolio_cache.get(
+            CHANGES_VIEW,
+            projection={"_id": 0, "version": 1, "changeLog": 1},
+            stale_on_error=True
+        )
+        if not snapshot:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        
+        # Every client polls this after each change event, so skip
+        # jsonable_encoder; the change log holds plain JSON types only
+        return FastJSONResponse(changes_since(
+            snapshot.data.get("version", 0), snapshot.data.get("changeLog", []), since
+        ))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise read_error(e, "Error fetching portfolio changes")
+
+
+@api_router.get("/portfolio/{section}")
+async def get_portfolio_section(
+    section: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT)
+):
+    """Get one section (personal-info, experience, certifications, skills, social-links)"""
+    try:
+        field = PORTFOLIO_SECTIONS.get(section)
+        if not field:
+            raise HTTPException(status_code=404, detail="Section not found")
+        
+        limit = effective_limit(limit, (field,))
+        snapshot = await portfolio_cache.get(
+            ("section", field, limit),
+            projection=portfolio_projection((field,), limit),
+            select=lambda doc: doc.get(field),
+            stale_on_error=True
+        )
+        if not snapshot or snapshot.data is None:
+            raise HTTPException(status_code=404, detail="Portfolio not found")
+        
+        return snapshot_response(request, snapshot)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise read_error(e, "Error fetching portfolio section")
+
+
+@api_router.get("/events")
+async def stream_events():
+    """Server-Sent Events: a "portfolio" or "documents" event after each change"""
+    if event_hub.full:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many event stream clients",
+            headers={"Retry-After": "30"}
+        )
+    
+    async def stream():
+        # Subscribing here ties the subscription to the generator's lifetime
+        subscriber = event_hub.subscribe()
+        try:
+            yield b"retry: 5000\n\n"
+            async for message in subscriber.messages():
+                yield message
+        finally:
+            event_hub.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @api_router.get("/documents/download/{doc_type}")
-async def download_document(doc_type: str):
-    """Download documents (resume-pdf, resume-docx, cover-letter-pdf, cover-letter-docx)"""
+async def download_document(doc_type: str, request: Request):
+    """Download documents (resume-pdf, resume-docx, cover-letter-pdf, cover-letter-docx).
+
+    Redirects to the immutable blob URL; documents stored before content
+    addressing are served here with Range/If-Range and conditional GET.
+    """
     try:
-        documents = await documents_collection.find_one({})
-        if not documents:
+        snapshot = await documents_cache.get(stale_on_error=True)
+        if not snapshot:
             raise HTTPException(status_code=404, detail="No documents found")
+        documents = snapshot.data
         
         # Map document types to database fields
         doc_mapping = {
@@ -92,33 +412,95 @@ async def download_document(doc_type: str):
         if not doc_info or not doc_info.get("path"):
             raise HTTPException(status_code=404, detail="Document not found")
         
+        # Resumed or partial fetches of the same download aren't counted again
+        range_header = request.headers.get("range")
+        if not range_header or range_header.replace(" ", "").startswith("bytes=0-"):
+            analytics.record("download", doc_type)
+        
+        if doc_info.get("sha256"):
+            # Send clients to the immutable, content-addressed URL
+            return RedirectResponse(
+                f"/api/documents/blob/{doc_info['sha256']}/{quote(doc_info['filename'])}",
+                status_code=302,
+                headers={"Cache-Control": "no-cache"}
+            )
+        
         file_path = Path(doc_info["path"])
-        if not file_path.exists():
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail="File not found on server")
         
-        return FileResponse(
+        last_modified = doc_info.get("uploadedAt") or datetime.utcfromtimestamp(stat.st_mtime)
+        version = format(int(last_modified.replace(tzinfo=timezone.utc).timestamp() * 1000), "x")
+        
+        return await file_response(
+            request,
             path=file_path,
             filename=doc_info["filename"],
-            media_type='application/octet-stream'
+            media_type=MEDIA_TYPES[doc_type.rsplit("-", 1)[-1]],
+            size=stat.st_size,
+            etag=f'"{version}-{stat.st_size:x}"',
+            last_modified=last_modified
         )
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error downloading document: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
+        raise read_error(e, "Error downloading document")
+
+
+@api_router.get("/documents/blob/{sha256}/{filename}")
+async def download_blob(sha256: str, filename: str, request: Request):
+    """Download a document by content hash; these URLs never change meaning"""
+    try:
+        snapshot = await documents_cache.get(stale_on_error=True)
+        documents = snapshot.data if snapshot else {}
+        doc_info = next(
+            (
+                info for info in documents.values()
+                if isinstance(info, dict) and info.get("sha256") == sha256
+            ),
+            None
+        )
+        if not doc_info:
+            raise HTTPException(status_code=404, detail="Document not found")
+        
+        extension = doc_info["filename"].rsplit(".", 1)[-1].lower()
+        return await file_response(
+            request,
+            path=content_store.path_for(sha256),
+            filename=filename,
+            media_type=MEDIA_TYPES.get(extension, "application/octet-stream"),
+            size=doc_info["size"],
+            etag=f'"{sha256}"',
+            last_modified=doc_info["uploadedAt"],
+            cache_control=IMMUTABLE_CACHE_CONTROL
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise read_error(e, "Error downloading document")
 
 
 # ===== AUTHENTICATION ENDPOINTS =====
 
 @api_router.post("/auth/login", response_model=LoginResponse)
-async def login(credentials: LoginRequest):
+async def login(credentials: LoginRequest, request: Request):
     """Admin login"""
     try:
+        await login_throttle.check(
+            client_ip(
+                request.client.host if request.client else None,
+                request.headers.get("x-forwarded-for"),
+                TRUSTED_PROXIES
+            ),
+            credentials.username
+        )
         admin = await admin_collection.find_one({"username": credentials.username})
         if not admin:
             raise HTTPException(status_code=401, detail="Invalid username or password")
         
-        if not verify_password(credentials.password, admin["password"]):
+        if not await verify_password_async(credentials.password, admin["password"]):
             raise HTTPException(status_code=401, detail="Invalid username or password")
         
         # Create access token
@@ -141,8 +523,58 @@ async def verify_token(username: str = Depends(get_current_user)):
     return {"valid": True, "username": username}
 
 
+@api_router.post("/auth/logout")
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Revoke the current JWT token on every worker"""
+    try:
+        await revoke_token(credentials.credentials)
+        return {"success": True, "message": "Logged out successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error during logout: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 # ===== PROTECTED ADMIN ENDPOINTS =====
 
+@api_router.get("/admin/metrics")
+async def get_metrics(username: str = Depends(get_current_user)):
+    """Internal performance counters"""
+    return {
+        "passwordHashing": password_hash_stats.as_dict(),
+        "loginThrottle": login_throttle.as_dict(),
+        "tokenCache": token_cache.as_dict(),
+        "staticSnapshot": static_snapshot.as_dict(),
+        "eventStream": event_hub.as_dict(),
+        "analytics": analytics.as_dict(),
+        "mongoBreaker": mongo_breaker.as_dict(),
+        "staleResponses": {
+            cache.name: cache.stale_served for cache in (portfolio_cache, documents_cache)
+        },
+        "mongoPool": pool_stats.as_dict(),
+        "mongoCommands": command_stats.as_dict()
+    }
+
+
+async def update_portfolio(query: dict, update: dict, change: dict) -> Optional[dict]:
+    """Apply ``update`` to the portfolio matching ``query``, logging ``change``.
+
+    Returns the updated document without its change log (or None if
+    nothing matched), which is also written through to the portfolio cache.
+    """
+    log = change_log_update([change], CHANGE_LOG_SIZE)
+    portfolio = await portfolio_collection.find_one_and_update(
+        query,
+        {**update, "$inc": log["$inc"], "$push": {**update.get("$push", {}), **log["$push"]}},
+        return_document=ReturnDocument.AFTER
+    )
+    if portfolio:
+        portfolio.pop("_id", None)
+        portfolio_changed(portfolio)
+    return portfolio
+
+
 @api_router.put("/admin/portfolio/personal")
 async def update_personal_info(
     personal_info: PersonalInfo,
@@ -150,20 +582,27 @@ async def update_personal_info(
 ):
     """Update personal information"""
     try:
-        result = await portfolio_collection.update_one(
+        value = personal_info.model_dump()
+        portfolio = await update_portfolio(
             {},
             {
                 "$set": {
-                    "personalInfo": personal_info.dict(),
+                    "personalInfo": value,
                     "updatedAt": datetime.utcnow()
                 }
-            }
+            },
+            {"op": "set", "section": "personalInfo", "value": value}
         )
         
-        if result.modified_count == 0:
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Portfolio not found")
         
-        return {"success": True, "message": "Personal information updated successfully"}
+        return {
+            "success": True,
+            "message": "Personal information updated successfully",
+            "personalInfo": portfolio["personalInfo"],
+            "version": portfolio["version"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -178,20 +617,27 @@ async def update_social_links(
 ):
     """Update social links"""
     try:
-        result = await portfolio_collection.update_one(
+        value = social_links.model_dump()
+        portfolio = await update_portfolio(
             {},
             {
                 "$set": {
-                    "socialLinks": social_links.dict(),
+                    "socialLinks": value,
                     "updatedAt": datetime.utcnow()
                 }
-            }
+            },
+            {"op": "set", "section": "socialLinks", "value": value}
         )
         
-        if result.modified_count == 0:
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Portfolio not found")
         
-        return {"success": True, "message": "Social links updated successfully"}
+        return {
+            "success": True,
+            "message": "Social links updated successfully",
+            "socialLinks": portfolio["socialLinks"],
+            "version": portfolio["version"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -206,18 +652,26 @@ async def add_experience(
 ):
     """Add new experience"""
     try:
-        result = await portfolio_collection.update_one(
+        value = experience.model_dump()
+        portfolio = await update_portfolio(
             {},
             {
-                "$push": {"experience": experience.dict()},
+                "$push": {"experience": value},
                 "$set": {"updatedAt": datetime.utcnow()}
-            }
+            },
+            {"op": "add", "section": "experience", "value": value}
         )
         
-        if result.modified_count == 0:
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Portfolio not found")
         
-        return {"success": True, "message": "Experience added successfully", "data": experience}
+        return {
+            "success": True,
+            "message": "Experience added successfully",
+            "data": experience,
+            "experience": portfolio["experience"],
+            "version": portfolio["version"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -233,20 +687,27 @@ async def update_experience(
 ):
     """Update experience by ID"""
     try:
-        result = await portfolio_collection.update_one(
+        value = experience.model_dump()
+        portfolio = await update_portfolio(
             {"experience.id": exp_id},
             {
                 "$set": {
-                    "experience.$": experience.dict(),
+                    "experience.$": value,
                     "updatedAt": datetime.utcnow()
                 }
-            }
+            },
+            {"op": "update", "section": "experience", "id": exp_id, "value": value}
         )
         
-        if result.modified_count == 0:
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Experience not found")
         
-        return {"success": True, "message": "Experience updated successfully"}
+        return {
+            "success": True,
+            "message": "Experience updated successfully",
+            "experience": portfolio["experience"],
+            "version": portfolio["version"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -261,18 +722,24 @@ async def delete_experience(
 ):
     """Delete experience by ID"""
     try:
-        result = await portfolio_collection.update_one(
-            {},
+        portfolio = await update_portfolio(
+            {"experience.id": exp_id},
             {
                 "$pull": {"experience": {"id": exp_id}},
                 "$set": {"updatedAt": datetime.utcnow()}
-            }
+            },
+            {"op": "delete", "section": "experience", "id": exp_id}
         )
         
-        if result.modified_count == 0:
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Experience not found")
         
-        return {"success": True, "message": "Experience deleted successfully"}
+        return {
+            "success": True,
+            "message": "Experience deleted successfully",
+            "experience": portfolio["experience"],
+            "version": portfolio["version"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -287,18 +754,26 @@ async def add_certification(
 ):
     """Add new certification"""
     try:
-        result = await portfolio_collection.update_one(
+        value = certification.model_dump()
+        portfolio = await update_portfolio(
             {},
             {
-                "$push": {"certifications": certification.dict()},
+                "$push": {"certifications": value},
                 "$set": {"updatedAt": datetime.utcnow()}
-            }
+            },
+            {"op": "add", "section": "certifications", "value": value}
         )
         
-        if result.modified_count == 0:
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Portfolio not found")
         
-        return {"success": True, "message": "Certification added successfully", "data": certification}
+        return {
+            "success": True,
+            "message": "Certification added successfully",
+            "data": certification,
+            "certifications": portfolio["certifications"],
+            "version": portfolio["version"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -314,20 +789,27 @@ async def update_certification(
 ):
     """Update certification by ID"""
     try:
-        result = await portfolio_collection.update_one(
+        value = certification.model_dump()
+        portfolio = await update_portfolio(
             {"certifications.id": cert_id},
             {
                 "$set": {
-                    "certifications.$": certification.dict(),
+                    "certifications.$": value,
                     "updatedAt": datetime.utcnow()
                 }
-            }
+            },
+            {"op": "update", "section": "certifications", "id": cert_id, "value": value}
         )
         
-        if result.modified_count == 0:
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Certification not found")
         
-        return {"success": True, "message": "Certification updated successfully"}
+        return {
+            "success": True,
+            "message": "Certification updated successfully",
+            "certifications": portfolio["certifications"],
+            "version": portfolio["version"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -342,18 +824,24 @@ async def delete_certification(
 ):
     """Delete certification by ID"""
     try:
-        result = await portfolio_collection.update_one(
-            {},
+        portfolio = await update_portfolio(
+            {"certifications.id": cert_id},
             {
                 "$pull": {"certifications": {"id": cert_id}},
                 "$set": {"updatedAt": datetime.utcnow()}
-            }
+            },
+            {"op": "delete", "section": "certifications", "id": cert_id}
         )
         
-        if result.modified_count == 0:
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Certification not found")
         
-        return {"success": True, "message": "Certification deleted successfully"}
+        return {
+            "success": True,
+            "message": "Certification deleted successfully",
+            "certifications": portfolio["certifications"],
+            "version": portfolio["version"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -368,18 +856,26 @@ async def add_skill(
 ):
     """Add new skill"""
     try:
-        result = await portfolio_collection.update_one(
+        value = skill.model_dump()
+        portfolio = await update_portfolio(
             {},
             {
-                "$push": {"skills": skill.dict()},
+                "$push": {"skills": value},
                 "$set": {"updatedAt": datetime.utcnow()}
-            }
+            },
+            {"op": "add", "section": "skills", "value": value}
         )
         
-        if result.modified_count == 0:
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Portfolio not found")
         
-        return {"success": True, "message": "Skill added successfully", "data": skill}
+        return {
+            "success": True,
+            "message": "Skill added successfully",
+            "data": skill,
+            "skills": portfolio["skills"],
+            "version": portfolio["version"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -395,20 +891,27 @@ async def update_skill(
 ):
     """Update skill by ID"""
     try:
-        result = await portfolio_collection.update_one(
+        value = skill.model_dump()
+        portfolio = await update_portfolio(
             {"skills.id": skill_id},
             {
                 "$set": {
-                    "skills.$": skill.dict(),
+                    "skills.$": value,
                     "updatedAt": datetime.utcnow()
                 }
-            }
+            },
+            {"op": "update", "section": "skills", "id": skill_id, "value": value}
         )
         
-        if result.modified_count == 0:
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Skill not found")
         
-        return {"success": True, "message": "Skill updated successfully"}
+        return {
+            "success": True,
+            "message": "Skill updated successfully",
+            "skills": portfolio["skills"],
+            "version": portfolio["version"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -423,18 +926,24 @@ async def delete_skill(
 ):
     """Delete skill by ID"""
     try:
-        result = await portfolio_collection.update_one(
-            {},
+        portfolio = await update_portfolio(
+            {"skills.id": skill_id},
             {
                 "$pull": {"skills": {"id": skill_id}},
                 "$set": {"updatedAt": datetime.utcnow()}
-            }
+            },
+            {"op": "delete", "section": "skills", "id": skill_id}
         )
         
-        if result.modified_count == 0:
+        if not portfolio:
             raise HTTPException(status_code=404, detail="Skill not found")
         
-        return {"success": True, "message": "Skill deleted successfully"}
+        return {
+            "success": True,
+            "message": "Skill deleted successfully",
+            "skills": portfolio["skills"],
+            "version": portfolio["version"]
+        }
     except HTTPException:
         raise
     except Exception as e:
@@ -442,6 +951,176 @@ async def delete_skill(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@api_router.get("/admin/stats")
+async def get_stats(
+    days: int = Query(30, ge=1, le=366),
+    username: str = Depends(get_current_user)
+):
+    """Document downloads and portfolio views over the last ?days="""
+    try:
+        since = datetime.utcnow() - timedelta(days=days)
+        totals = await analytics.totals(since)
+        return {
+            "since": analytics.bucket(since),
+            "downloads": totals.get("download", {}),
+            "portfolioViews": sum(totals.get("portfolio_view", {}).values())
+        }
+    except Exception as e:
+        logger.error(f"Error fetching stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+# Schema for each section the batch endpoint can edit
+SECTION_MODELS = {
+    "personalInfo": PersonalInfo,
+    "socialLinks": SocialLinks,
+    "experience": Experience,
+    "certifications": Certification,
+    "skills": Skill
+}
+BATCH_MAX_ATTEMPTS = 3
+
+
+def apply_operation(sections: dict, operation: PortfolioOperation, changes: list) -> dict:
+    """Apply one batch operation to in-memory portfolio sections.
+
+    Returns the per-operation result; ``sections`` is only changed, and a
+    change-log entry appended to ``changes``, when the operation succeeds.
+    """
+    result = {"op": operation.op, "section": operation.section, "id": operation.id}
+    model = SECTION_MODELS[operation.section]
+    is_list = operation.section in ARRAY_FIELDS
+    
+    if (operation.op == "set") == is_list:
+        return {**result, "success": False, "error": f"'{operation.op}' is not valid for {operation.section}"}
+    if operation.op in ("update", "delete") and not operation.id:
+        return {**result, "success": False, "error": "id is required"}
+    
+    value = None
+    if operation.op != "delete":
+        data = dict(operation.data or {})
+        if operation.op == "update":
+            data["id"] = operation.id
+        try:
+            value = model(**data).model_dump()
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            )
+            return {**result, "success": False, "error": errors}
+    
+    if operation.op == "set":
+        sections[operation.section] = value
+        changes.append({"op": "set", "section": operation.section, "value": value})
+        return {**result, "success": True}
+    
+    items = sections.get(operation.section)
+    if items is None:
+        items = sections[operation.section] = []
+    if operation.op == "add":
+        items.append(value)
+        changes.append({"op": "add", "section": operation.section, "value": value})
+        return {**result, "id": value["id"], "success": True}
+    
+    index = next((i for i, item in enumerate(items) if item.get("id") == operation.id), None)
+    if index is None:
+        return {**result, "success": False, "error": "Item not found"}
+    if operation.op == "update":
+        items[index] = value
+        changes.append({"op": "update", "section": operation.section, "id": operation.id, "value": value})
+    else:
+        del items[index]
+        changes.append({"op": "delete", "section": operation.section, "id": operation.id})
+    return {**result, "success": True}
+
+
+@api_router.post("/admin/portfolio/batch")
+async def batch_update_portfolio(
+    batch: PortfolioBatch,
+    username: str = Depends(get_current_user)
+):
+    """Apply many portfolio edits with a single update.
+
+    Operations are applied in order to the cached portfolio and the touched
+    sections are written back in one update, guarded by ``version`` so a
+    concurrent write is retried rather than overwritten. Invalid operations
+    are reported per operation and skipped.
+    """
+    try:
+        touched = {operation.section for operation in batch.operations}
+        
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            snapshot = await portfolio_cache.get()
+            if not snapshot:
+                raise HTTPException(status_code=404, detail="Portfolio not found")
+            
+            base = snapshot.data
+            sections = {section: copy.deepcopy(base.get(section)) for section in touched}
+            changes = []
+            results = [
+                apply_operation(sections, operation, changes) for operation in batch.operations
+            ]
+            changed = {
+                result["section"] for result in results if result["success"]
+            }
+            if not changed:
+                break
+            
+            portfolio = await portfolio_collection.find_one_and_update(
+                {"version": base.get("version")},
+                {
+                    "$set": {
+                        **{section: sections[section] for section in changed},
+                        "updatedAt": datetime.utcnow()
+                    },
+                    **change_log_update(changes, CHANGE_LOG_SIZE)
+                },
+                return_document=ReturnDocument.AFTER
+            )
+            if portfolio:
+                portfolio.pop("_id", None)
+                portfolio_changed(portfolio)
+                break
+            # Someone else wrote first; our cached copy is out of date
+            portfolio_cache.invalidate()
+        else:
+            raise HTTPException(
+                status_code=409,
+                detail="Portfolio was modified concurrently, please retry"
+            )
+        
+        applied = sum(1 for result in results if result["success"])
+        response = {
+            "success": applied == len(results),
+            "message": f"Applied {applied} of {len(results)} operations",
+            "results": results,
+            "version": base.get("version", 0)
+        }
+        if changed:
+            response.update({section: portfolio[section] for section in changed})
+            response["version"] = portfolio["version"]
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error applying portfolio batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def remove_replaced_files(previous: dict, current: dict):
+    """Delete uploaded files no longer referenced by the documents record"""
+    referenced = {info.get("path") for info in current.values() if isinstance(info, dict)}
+    for info in previous.values():
+        path = info.get("path") if isinstance(info, dict) else None
+        if not path or path in referenced or not Path(path).is_relative_to(UPLOAD_DIR):
+            continue
+        try:
+            Path(path).unlink(missing_ok=True)
+        except OSError as e:
+            logger.error(f"Error removing replaced file {path}: {str(e)}")
+
+
 @api_router.post("/admin/documents/upload")
 async def upload_documents(
     username: str = Depends(get_current_user),
@@ -450,76 +1129,95 @@ async def upload_documents(
     coverLetterPDF: Optional[UploadFile] = File(None),
     coverLetterDOCX: Optional[UploadFile] = File(None)
 ):
-    """Upload documents"""
+    """Upload documents.
+
+    All files are stored concurrently and then recorded with a single upsert;
+    if any file is rejected nothing is recorded.
+    """
     try:
-        uploaded_files = {}
-        documents = await documents_collection.find_one({})
-        
-        if not documents:
-            # Create documents record if it doesn't exist
-            documents = {
-                "resumePDF": {"filename": "", "path": "", "uploadedAt": None},
-                "resumeDOCX": {"filename": "", "path": "", "uploadedAt": None},
-                "coverLetterPDF": {"filename": "", "path": "", "uploadedAt": None},
-                "coverLetterDOCX": {"filename": "", "path": "", "uploadedAt": None}
-            }
-            await documents_collection.insert_one(documents)
-            documents = await documents_collection.find_one({})
+        files = {
+            "resumePDF": resumePDF,
+            "resumeDOCX": resumeDOCX,
+            "coverLetterPDF": coverLetterPDF,
+            "coverLetterDOCX": coverLetterDOCX
+        }
+        files = {field_name: file for field_name, file in files.items() if file}
+        if not files:
+            raise HTTPException(status_code=400, detail="No files uploaded")
+        
+        allowed_types = {
+            "PDF": ["application/pdf"],
+            "DOCX": ["application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
+        }
         
         # Helper function to save file
-        async def save_file(file: UploadFile, category: str, field_name: str):
-            if file:
-                # Validate file type
-                allowed_types = {
-                    "PDF": ["application/pdf"],
-                    "DOCX": ["application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
-                }
-                
-                file_type = field_name.split("resume")[-1].split("coverLetter")[-1]
-                if file.content_type not in allowed_types.get(file_type, []):
-                    raise HTTPException(status_code=400, detail=f"Invalid file type for {field_name}")
-                
-                # Save file
-                timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-                filename = f"{timestamp}_{file.filename}"
-                file_path = UPLOAD_DIR / category / filename
-                
-                with open(file_path, "wb") as buffer:
-                    shutil.copyfileobj(file.file, buffer)
-                
-                # Update database
-                await documents_collection.update_one(
-                    {"_id": documents["_id"]},
-                    {
-                        "$set": {
-                            field_name: {
-                                "filename": file.filename,
-                                "path": str(file_path),
-                                "uploadedAt": datetime.utcnow()
-                            }
-                        }
-                    }
+        async def save_file(field_name: str, file: UploadFile) -> dict:
+            # Validate file type
+            file_type = field_name.split("resume")[-1].split("coverLetter")[-1]
+            if file.content_type not in allowed_types.get(file_type, []):
+                raise HTTPException(status_code=400, detail=f"Invalid file type for {field_name}")
+            
+            if file.size is not None and file.size > MAX_UPLOAD_SIZE:
+                raise HTTPException(status_code=413, detail=f"{field_name} is too large")
+            
+            # Save file under its content hash, off the event loop
+            try:
+                stored = await run_in_threadpool(
+                    content_store.save, file.file, MAX_UPLOAD_SIZE, file.content_type
                 )
-                
-                uploaded_files[field_name] = file.filename
-        
-        # Save all uploaded files
-        if resumePDF:
-            await save_file(resumePDF, "resumes", "resumePDF")
-        if resumeDOCX:
-            await save_file(resumeDOCX, "resumes", "resumeDOCX")
-        if coverLetterPDF:
-            await save_file(coverLetterPDF, "cover-letters", "coverLetterPDF")
-        if coverLetterDOCX:
-            await save_file(coverLetterDOCX, "cover-letters", "coverLetterDOCX")
-        
-        if not uploaded_files:
-            raise HTTPException(status_code=400, detail="No files uploaded")
+            except FileTooLarge:
+                raise HTTPException(status_code=413, detail=f"{field_name} is too large")
+            except InvalidFileType:
+                raise HTTPException(status_code=400, detail=f"Invalid file type for {field_name}")
+            
+            return {
+                "filename": file.filename,
+                "path": str(content_store.path_for(stored.sha256)),
+                "sha256": stored.sha256,
+                "size": stored.size,
+                "contentType": file.content_type,
+                "uploadedAt": datetime.utcnow()
+            }
+        
+        results = await asyncio.gather(
+            *(save_file(field_name, file) for field_name, file in files.items()),
+            return_exceptions=True
+        )
+        saved = {
+            field_name: result
+            for field_name, result in zip(files, results)
+            if not isinstance(result, BaseException)
+        }
+        
+        try:
+            failure = next((r for r in results if isinstance(r, BaseException)), None)
+            if failure:
+                raise failure
+            
+            # Record every file in one round-trip
+            previous = await documents_collection.find_one_and_update(
+                {},
+                {"$set": {**saved, "updatedAt": datetime.utcnow()}},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+        except Exception:
+            # Nothing was recorded; drop files that only this upload references
+            try:
+                snapshot = await documents_cache.get()
+                remove_replaced_files(saved, snapshot.data if snapshot else {})
+            except Exception as e:
+                logger.error(f"Error cleaning up rejected upload: {str(e)}")
+            raise
+        
+        documents_cache.invalidate()
+        previous = previous or {}
+        remove_replaced_files(previous, {**previous, **saved})
         
         return {
             "success": True,
             "message": "Documents uploaded successfully",
-            "uploadedFiles": uploaded_files
+            "uploadedFiles": {field_name: file.filename for field_name, file in files.items()}
         }
     except HTTPException:
         raise
@@ -528,9 +1226,96 @@ async def upload_documents(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+def collect_component_metrics():
+    """Export counters kept by other modules on each Prometheus scrape"""
+    hashing = password_hash_stats.as_dict()
+    yield ("password_hash_in_flight", "gauge", "bcrypt jobs running or queued",
+           [((), hashing["inFlight"])])
+    yield ("password_hash_completed_total", "counter", "bcrypt jobs completed",
+           [((), hashing["completed"])])
+    yield ("password_hash_rejected_total", "counter", "bcrypt jobs refused because the queue was full",
+           [((), hashing["rejected"])])
+    yield ("password_hash_run_seconds_total", "counter", "Time spent running bcrypt",
+           [((), password_hash_stats.run_seconds)])
+    
+    throttle = login_throttle.as_dict()
+    yield ("login_attempts_total", "counter", "Login attempts by throttling outcome",
+           [((("outcome", "allowed"),), throttle["allowed"]),
+            ((("outcome", "rejected"),), throttle["rejected"])])
+    
+    tokens = token_cache.as_dict()
+    yield ("token_cache_lookups_total", "counter", "Verified-JWT cache lookups by result",
+           [((("result", "hit"),), tokens["hits"]), ((("result", "miss"),), tokens["misses"])])
+    yield ("token_cache_entries", "gauge", "Verified JWTs currently cached",
+           [((), tokens["size"])])
+    
+    pool = pool_stats.as_dict()
+    yield ("mongo_pool_open_connections", "gauge", "Open MongoDB connections",
+           [((), pool["openConnections"])])
+    yield ("mongo_pool_checked_out_connections", "gauge", "MongoDB connections in use",
+           [((), pool["checkedOut"])])
+    yield ("mongo_pool_checkouts_total", "counter", "MongoDB connection checkouts",
+           [((), pool["checkouts"])])
+    yield ("mongo_pool_checkout_wait_seconds_total", "counter", "Time spent waiting for a MongoDB connection",
+           [((), pool_stats.checkout_wait_seconds)])
+    
+    commands = command_stats.as_dict()
+    yield ("mongo_commands_total", "counter", "MongoDB commands by name",
+           [((("command", name),), stats["count"]) for name, stats in commands.items()])
+    yield ("mongo_command_failures_total", "counter", "Failed MongoDB commands by name",
+           [((("command", name),), stats["failures"]) for name, stats in commands.items()])
+    yield ("mongo_command_seconds_total", "counter", "Time spent in MongoDB commands by name",
+           [((("command", name),), stats["totalMs"] / 1000) for name, stats in commands.items()])
+    
+    events = event_hub.as_dict()
+    yield ("sse_clients", "gauge", "Connected event stream clients",
+           [((), events["clients"])])
+    yield ("sse_events_published_total", "counter", "Change events sent to event stream clients",
+           [((), events["published"])])
+    yield ("sse_clients_evicted_total", "counter", "Event stream clients dropped for falling behind",
+           [((), events["evicted"])])
+    
+    counters = analytics.as_dict()
+    yield ("analytics_pending_events", "gauge", "Counted events not yet written to MongoDB",
+           [((), counters["pending"])])
+    yield ("analytics_flushes_total", "counter", "Analytics flushes by outcome",
+           [((("outcome", "ok"),), counters["flushes"]),
+            ((("outcome", "failed"),), counters["flushFailures"])])
+    
+    breaker = mongo_breaker.as_dict()
+    yield ("mongo_circuit_state", "gauge", "MongoDB circuit breaker state (1 for the current one)",
+           [((("state", state),), int(state == breaker["state"])) for state in CIRCUIT_STATES])
+    yield ("mongo_circuit_transitions_total", "counter", "MongoDB circuit breaker transitions by new state",
+           [((("state", state),), count) for state, count in breaker["transitions"].items()])
+    yield ("mongo_circuit_rejected_total", "counter", "MongoDB calls failed fast by the open circuit",
+           [((), breaker["rejected"])])
+    yield ("cache_stale_responses_total", "counter", "Last known good snapshots served after a failed load",
+           [((("cache", cache.name),), cache.stale_served) for cache in (portfolio_cache, documents_cache)])
+
+
+registry.add_collector(collect_component_metrics)
+
+# Optional bearer token required to scrape /metrics
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request):
+    """Metrics in the Prometheus text format"""
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(
+        content=registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(CommandTimingMiddleware)
+app.add_middleware(PrometheusMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -543,5 +1328,22 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
+    await warm_up_pool()
     await init_database()
-    logger.info("Database initialized")
\ No newline at end of file
+    logger.info("Database initialized")
+    cache_watcher.start()
+    event_hub.start()
+    analytics.start()
+    token_revocations.start(revoked_tokens_collection)
+    static_snapshot.schedule()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks"""
+    await cache_watcher.stop()
+    await static_snapshot.stop()
+    await event_hub.stop()
+    await token_revocations.stop()
+    # Write out counts still in memory
+    await analytics.stop()
\ No newline at end of file
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import os
+import tempfile
+from html import escape
+from pathlib import Path
+from typing import Optional
+
+import anyio
+import orjson
+
+from cache import Snapshot, SnapshotCache
+from monitoring import start_background_task
+
+logger = logging.getLogger(__name__)
+
+JSON_FILENAME = "portfolio.json"
+HTML_FILENAME = "index.html"
+
+
+def write_atomic(path: Path, content: bytes):
+    """Replace ``path`` with ``content`` so readers never see a partial file"""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        # mkstemp creates the file owner-only; the web server must read it
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def render_html(portfolio: dict, body: bytes) -> bytes:
+    """A crawlable, script-free page of the portfolio.
+
+    The JSON is embedded as well so a client can hydrate from it without
+    another request.
+    """
+    info = portfolio.get("personalInfo") or {}
+    links = portfolio.get("socialLinks") or {}
+
+    experience = "".join(
+        f"<li><h3>{escape(item.get('position', ''))} at {escape(item.get('company', ''))}</h3>"
+        f"<p>{escape(item.get('startDate', ''))} – "
+        f"{'Present' if item.get('isCurrent') else escape(item.get('endDate', ''))}</p>"
+        f"<p>{escape(item.get('description', ''))}</p>"
+        f"<ul>{''.join(f'<li>{escape(r)}</li>' for r in item.get('responsibilities', []))}</ul></li>"
+        for item in portfolio.get("experience", [])
+    )
+    certifications = "".join(
+        f"<li>{escape(item.get('name', ''))}, {escape(item.get('issuingOrg', ''))} "
+        f"({escape(item.get('issueDate', ''))})</li>"
+        for item in portfolio.get("certifications", [])
+    )
+    skills = "".join(
+        f"<li>{escape(item.get('name', ''))} ({int(item.get('level', 0))}%)</li>"
+        for item in portfolio.get("skills", [])
+    )
+    social = "".join(
+        f'<li><a href="{escape(url)}">{escape(name.title())}</a></li>'
+        for name, url in links.items() if url
+    )
+    # Keep the JSON from closing the script element early
+    data = body.decode("utf-8").replace("<", "\\u003c")
+
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{escape(info.get('name', 'Portfolio'))} – {escape(info.get('jobTitle', ''))}</title>
+<meta name="description" content="{escape(info.get('aboutMe', '')[:160])}">
+</head>
+<body>
+<header>
+<img src="{escape(info.get('profilePicture', ''))}" alt="{escape(info.get('name', ''))}" width="160" height="160">
+<h1>{escape(info.get('name', ''))}</h1>
+<p>{escape(info.get('jobTitle', ''))} · {escape(info.get('location', ''))}</p>
+</header>
+<main>
+<section id="about"><h2>About</h2><p>{escape(info.get('aboutMe', ''))}</p></section>
+<section id="experience"><h2>Experience</h2><ul>{experience}</ul></section>
+<section id="certifications"><h2>Certifications</h2><ul>{certifications}</ul></section>
+<section id="skills"><h2>Skills</h2><ul>{skills}</ul></section>
+<section id="contact"><h2>Contact</h2>
+<p><a href="mailto:{escape(info.get('email', ''))}">{escape(info.get('email', ''))}</a> · {escape(info.get('phone', ''))}</p>
+<ul>{social}</ul></section>
+</main>
+<script id="portfolio-data" type="application/json">{data}</script>
+</body>
+</html>
+""".encode("utf-8")
+
+
+class StaticSnapshotPublisher:
+    """Pre-renders the portfolio to static files after each admin write.
+
+    ``schedule()`` is called once a write has succeeded; after
+    ``debounce_seconds`` without further writes the current portfolio is
+    written to ``portfolio.json`` (plus a gzip copy for ``gzip_static``)
+    and ``index.html`` in ``directory``, each replaced atomically. A web
+    server or CDN can serve those files directly, and the API serves them
+    when their ``version`` is current or MongoDB can't be reached.
+
+    Every worker renders after every change it sees, and a render never
+    replaces a file holding a newer version, so the files converge on the
+    latest portfolio even when a worker renders from an outdated cache.
+    """
+
+    def __init__(self, cache: SnapshotCache, directory: Optional[Path], debounce_seconds: float = 1.0):
+        self.cache = cache
+        self.directory = directory
+        self.debounce_seconds = debounce_seconds
+        self.renders = 0
+        self.failures = 0
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._loaded: Optional[tuple] = None
+        if directory:
+            directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def json_path(self) -> Path:
+        return self.directory / JSON_FILENAME
+
+    def schedule(self):
+        """Render the files soon, coalescing bursts of writes into one render"""
+        if not self.directory:
+            return
+        self._dirty = True
+        if self._task is None or self._task.done():
+            # Usually called from an admin request, which the render
+            # shouldn't be attributed to
+            self._task = start_background_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while self._dirty:
+            await asyncio.sleep(self.debounce_seconds)
+            self._dirty = False
+            try:
+                await self.render()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Error rendering static portfolio snapshot: {str(e)}")
+
+    async def render(self):
+        snapshot = await self.cache.get()
+        if snapshot is None:
+            return
+        published = self.load()
+        if published is not None and published.data.get("version", -1) > snapshot.data.get("version", -1):
+            return
+        html = render_html(snapshot.data, snapshot.body)
+        gzipped, encoding = snapshot.encoded("gzip")
+
+        def write_files():
+            write_atomic(self.directory / HTML_FILENAME, html)
+            gzip_path = self.directory / f"{JSON_FILENAME}.gz"
+            if encoding:
+                write_atomic(gzip_path, gzipped)
+            elif gzip_path.exists():
+                gzip_path.unlink()
+            # Written last, so whoever reads it finds the other files of the
+            # same version in place
+            write_atomic(self.json_path, snapshot.body)
+
+        await anyio.to_thread.run_sync(write_files)
+        self.renders += 1
+        logger.info(f"Static portfolio snapshot written to {self.directory}")
+
+    def load(self, min_version: Optional[int] = None) -> Optional[Snapshot]:
+        """Return the published JSON as a Snapshot.
+
+        With ``min_version``, a file holding an older portfolio version is
+        ignored. The parsed file is kept until it changes on disk.
+        """
+        if not self.directory:
+            return None
+        try:
+            stat = self.json_path.stat()
+            file_version = (stat.st_mtime_ns, stat.st_size)
+            if self._loaded and self._loaded[0] == file_version:
+                snapshot = self._loaded[1]
+            else:
+                snapshot = Snapshot(orjson.loads(self.json_path.read_bytes()))
+                self._loaded = (file_version, snapshot)
+        except (OSError, ValueError):
+            return None
+        if min_version is not None and snapshot.data.get("version", -1) < min_version:
+            return None
+        return snapshot
+
+    def as_dict(self) -> dict:
+        return {
+            "enabled": bool(self.directory),
+            "renders": self.renders,
+            "failures": self.failures,
+            "pending": self._dirty
+        }
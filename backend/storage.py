@@ -0,0 +1,114 @@
+import hashlib
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+# Leading bytes identifying the document formats we accept
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class UploadRejected(Exception):
+    """Base class for uploads the store refuses to keep"""
+
+
+class FileTooLarge(UploadRejected):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+class InvalidFileType(UploadRejected):
+    """Raised when an upload's content doesn't match its declared type"""
+
+
+class StoredObject(NamedTuple):
+    sha256: str
+    size: int
+    sniffed_type: Optional[str]
+
+
+def sniff_media_type(head: bytes) -> Optional[str]:
+    """Guess a document's media type from its first bytes"""
+    if head.startswith(PDF_MAGIC):
+        return "application/pdf"
+    if head.startswith(ZIP_MAGIC):
+        # DOCX files are zip archives; the container is all we can check cheaply
+        return DOCX_MEDIA_TYPE
+    return None
+
+
+class ContentStore:
+    """Stores files on disk under the SHA-256 of their content.
+
+    Objects live at ``<root>/<first two hex chars>/<sha256>`` so identical
+    uploads share one file and an object's path never changes meaning.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.tmp_dir = root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def save(
+        self,
+        source: BinaryIO,
+        max_size: Optional[int] = None,
+        expected_type: Optional[str] = None
+    ) -> StoredObject:
+        """Copy ``source`` into the store in a single pass.
+
+        The content is hashed, size-checked and sniffed while it is copied
+        to a temporary file, which is then renamed into place atomically. If
+        an object with the same content already exists the new copy is
+        discarded. This does blocking I/O; call it from a worker thread.
+        """
+        sha256 = hashlib.sha256()
+        size = 0
+        sniffed_type = None
+        fd, tmp_name = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as buffer:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if size == 0:
+                        sniffed_type = sniff_media_type(chunk)
+                        if expected_type and sniffed_type != expected_type:
+                            raise InvalidFileType(f"Content is not {expected_type}")
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise FileTooLarge(f"File exceeds {max_size} bytes")
+                    sha256.update(chunk)
+                    buffer.write(chunk)
+
+            if expected_type and size == 0:
+                raise InvalidFileType("File is empty")
+
+            digest = sha256.hexdigest()
+            path = self.path_for(digest)
+            if path.exists():
+                os.unlink(tmp_name)
+            else:
+                path.parent.mkdir(exist_ok=True)
+                os.replace(tmp_name, path)
+            return StoredObject(digest, size, sniffed_type)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def delete(self, digest: str):
+        try:
+            self.path_for(digest).unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+from typing import List
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from cache import SnapshotCache
+
+logger = logging.getLogger(__name__)
+
+# auto: change streams, falling back to polling; or force "changestream",
+# "poll" or "off"
+CACHE_SYNC_MODE = os.getenv("CACHE_SYNC_MODE", "auto").lower()
+CACHE_POLL_INTERVAL_SECONDS = float(os.getenv("CACHE_POLL_INTERVAL_SECONDS", "2"))
+
+# Server error codes meaning change streams aren't available on this
+# deployment (standalone server, unsupported storage engine, ...)
+CHANGE_STREAM_UNSUPPORTED_CODES = {40573, 40324, 136}
+
+RETRY_DELAY_SECONDS = 1.0
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+# updatedAt before the first look at the document
+UNSEEN = object()
+
+
+def changed_fields(change: dict) -> dict:
+    """The fields a change stream event sets (the whole document for inserts
+    and replacements)"""
+    return change.get("fullDocument") or change.get("updateDescription", {}).get("updatedFields") or {}
+
+
+def already_cached(cache: SnapshotCache, version) -> bool:
+    """Whether ``cache`` already holds ``version`` or a newer one, as it does
+    on the worker that made the write and stored its post-image"""
+    return version is not None and cache.version is not None and version <= cache.version
+
+
+class CacheWatcher:
+    """Keeps every worker's snapshot caches coherent with MongoDB.
+
+    One background task per cache follows a change stream on the cached
+    collection and invalidates the cache on every event, so a write handled
+    by any worker on any node is seen everywhere; events for a version the
+    cache already holds are skipped. Deployments without change
+    streams fall back to polling the document's ``updatedAt``.
+
+    Only real changes reach the cache's listeners (and so SSE clients).
+    Reconnects compare ``updatedAt`` with the last value seen instead of
+    announcing a change, and retries after errors invalidate quietly.
+    """
+
+    def __init__(self, caches: List[SnapshotCache]):
+        self.caches = caches
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        if CACHE_SYNC_MODE == "off":
+            logger.info("Cache sync disabled")
+            return
+        for cache in self.caches:
+            self._tasks.append(asyncio.create_task(self._run(cache)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, cache: SnapshotCache):
+        if CACHE_SYNC_MODE != "poll":
+            supported = await self._watch(cache)
+            if supported or CACHE_SYNC_MODE == "changestream":
+                return
+        await self._poll(cache)
+
+    async def _check(self, cache: SnapshotCache, last_seen):
+        """Invalidate ``cache`` if the document's updatedAt moved since
+        ``last_seen``; returns the updatedAt seen now"""
+        document = await cache.collection.find_one({}, {"updatedAt": 1, "version": 1})
+        updated_at = document.get("updatedAt") if document else None
+        version = document.get("version") if document else None
+        if updated_at != last_seen and not already_cached(cache, version):
+            # The first look only tells us where we are, not that it changed
+            cache.invalidate(version=version, changed=last_seen is not UNSEEN)
+        return updated_at
+
+    async def _watch(self, cache: SnapshotCache) -> bool:
+        """Follow a change stream; returns False if they aren't supported"""
+        delay = RETRY_DELAY_SECONDS
+        last_seen = UNSEEN
+        while True:
+            try:
+                async with cache.collection.watch() as stream:
+                    # Anything written before the stream opened may be missing
+                    # from the snapshot
+                    last_seen = await self._check(cache, last_seen)
+                    logger.info(f"Watching {cache.name} changes via change stream")
+                    delay = RETRY_DELAY_SECONDS
+                    async for change in stream:
+                        fields = changed_fields(change)
+                        if not already_cached(cache, fields.get("version")):
+                            cache.invalidate(version=fields.get("version"))
+                        last_seen = fields.get("updatedAt", last_seen)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAM_UNSUPPORTED_CODES:
+                    logger.info(
+                        f"Change streams unavailable for {cache.name} ({e.code}), "
+                        f"polling every {CACHE_POLL_INTERVAL_SECONDS}s"
+                    )
+                    return False
+                logger.error(f"Change stream error on {cache.name}: {str(e)}")
+            except PyMongoError as e:
+                logger.error(f"Change stream error on {cache.name}: {str(e)}")
+
+            cache.invalidate(changed=False)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY_SECONDS)
+
+    async def _poll(self, cache: SnapshotCache):
+        """Invalidate the cache whenever the document's updatedAt moves"""
+        last_seen = UNSEEN
+        while True:
+            try:
+                last_seen = await self._check(cache, last_seen)
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                logger.error(f"Error polling {cache.name}: {str(e)}")
+            await asyncio.sleep(CACHE_POLL_INTERVAL_SECONDS)
@@ -13,15 +13,10 @@ import {
   getPortfolio,
   updatePersonalInfo,
   updateSocialLinks,
-  addExperience,
-  updateExperience,
   deleteExperience,
-  addCertification,
-  updateCertification,
   deleteCertification,
-  addSkill,
-  updateSkill,
   deleteSkill,
+  batchUpdatePortfolio,
   uploadDocuments,
   verifyToken
 } from '../services/api';
@@ -29,6 +24,8 @@ import {
 const AdminDashboard = () => {
   const navigate = useNavigate();
   const [portfolioData, setPortfolioData] = useState(null);
+  // What the server last confirmed, to tell which edits still need saving
+  const [savedData, setSavedData] = useState(null);
   const [loading, setLoading] = useState(true);
   const [saving, setSaving] = useState(false);
   
@@ -63,6 +60,7 @@ const AdminDashboard = () => {
     try {
       const data = await getPortfolio();
       setPortfolioData(data);
+      setSavedData(data);
     } catch (error) {
       console.error('Error fetching portfolio:', error);
       toast({
@@ -80,11 +78,71 @@ const AdminDashboard = () => {
     navigate('/admin/login');
   };
 
+  // Record the sections a mutation response says the server now holds
+  const applyServerState = (result, sections) => {
+    setSavedData(prev => {
+      const next = { ...prev, version: Math.max(prev?.version ?? 0, result.version) };
+      sections.forEach(section => {
+        next[section] = result[section];
+      });
+      return next;
+    });
+  };
+
+  // Drop client-only fields before sending an item
+  const toPayload = ({ isNew, ...item }) => item;
+
+  // Send the added and changed items of a list section in one batch request
+  const saveListSection = async (section) => {
+    const saved = new Map((savedData?.[section] || []).map(item => [item.id, item]));
+    const pending = portfolioData[section].filter(item => (
+      item.isNew || JSON.stringify(toPayload(item)) !== JSON.stringify(saved.get(item.id))
+    ));
+    if (pending.length === 0) {
+      return;
+    }
+
+    const result = await batchUpdatePortfolio(pending.map(item => {
+      const { id, ...data } = toPayload(item);
+      return item.isNew ? { op: 'add', section, data } : { op: 'update', section, id, data };
+    }));
+    if (result[section]) {
+      applyServerState(result, [section]);
+    }
+
+    // Swap saved placeholders for the stored items, which have the real ids
+    const stored = new Map((result[section] || []).map(item => [item.id, item]));
+    const added = new Map();
+    result.results.forEach((outcome, index) => {
+      if (outcome.success && pending[index].isNew) {
+        added.set(pending[index].id, stored.get(outcome.id));
+      }
+    });
+    if (added.size > 0) {
+      setPortfolioData(prev => ({
+        ...prev,
+        [section]: prev[section].map(item => added.get(item.id) || item)
+      }));
+    }
+
+    const failed = result.results.filter(outcome => !outcome.success);
+    if (failed.length > 0) {
+      // Shaped like an API error so the callers' toasts show the reason
+      const error = new Error('Some changes were not saved');
+      error.response = { data: { detail: failed.map(outcome => outcome.error).join('; ') } };
+      throw error;
+    }
+  };
+
   const handleSavePersonalInfo = async () => {
     setSaving(true);
     try {
-      await updatePersonalInfo(portfolioData.personalInfo);
-      await updateSocialLinks(portfolioData.socialLinks);
+      const [personal, social] = await Promise.all([
+        updatePersonalInfo(portfolioData.personalInfo),
+        updateSocialLinks(portfolioData.socialLinks)
+      ]);
+      applyServerState(personal, ['personalInfo']);
+      applyServerState(social, ['socialLinks']);
       toast({
         title: "Success",
         description: "Personal information updated successfully!",
@@ -118,6 +176,7 @@ const AdminDashboard = () => {
   const handleAddExperience = () => {
     const newExp = {
       id: Date.now().toString(),
+      isNew: true,
       company: '',
       position: '',
       startDate: '',
@@ -133,8 +192,13 @@ const AdminDashboard = () => {
   };
 
   const handleDeleteExperience = async (id) => {
+    const exp = portfolioData.experience.find(item => item.id === id);
     try {
-      await deleteExperience(id);
+      // Unsaved items only exist here
+      if (!exp?.isNew) {
+        const result = await deleteExperience(id);
+        applyServerState(result, ['experience']);
+      }
       setPortfolioData(prev => ({
         ...prev,
         experience: prev.experience.filter(exp => exp.id !== id)
@@ -155,6 +219,7 @@ const AdminDashboard = () => {
   const handleAddCertification = () => {
     const newCert = {
       id: Date.now().toString(),
+      isNew: true,
       name: '',
       issuingOrg: '',
       issueDate: '',
@@ -167,8 +232,13 @@ const AdminDashboard = () => {
   };
 
   const handleDeleteCertification = async (id) => {
+    const cert = portfolioData.certifications.find(item => item.id === id);
     try {
-      await deleteCertification(id);
+      // Unsaved items only exist here
+      if (!cert?.isNew) {
+        const result = await deleteCertification(id);
+        applyServerState(result, ['certifications']);
+      }
       setPortfolioData(prev => ({
         ...prev,
         certifications: prev.certifications.filter(cert => cert.id !== id)
@@ -189,6 +259,7 @@ const AdminDashboard = () => {
   const handleAddSkill = () => {
     const newSkill = {
       id: Date.now().toString(),
+      isNew: true,
       name: '',
       level: 50
     };
@@ -199,8 +270,13 @@ const AdminDashboard = () => {
   };
 
   const handleDeleteSkill = async (id) => {
+    const skill = portfolioData.skills.find(item => item.id === id);
     try {
-      await deleteSkill(id);
+      // Unsaved items only exist here
+      if (!skill?.isNew) {
+        const result = await deleteSkill(id);
+        applyServerState(result, ['skills']);
+      }
       setPortfolioData(prev => ({
         ...prev,
         skills: prev.skills.filter(skill => skill.id !== id)
@@ -221,17 +297,15 @@ const AdminDashboard = () => {
   const handleSaveExperience = async () => {
     setSaving(true);
     try {
-      // For simplicity, we'll refetch the data after saving
-      // In production, you might want to update each experience individually
+      await saveListSection('experience');
       toast({
         title: "Success",
         description: "Experience updated successfully!",
       });
-      await fetchPortfolioData();
     } catch (error) {
       toast({
         title: "Error",
-        description: "Failed to update experience",
+        description: error.response?.data?.detail || "Failed to update experience",
         variant: "destructive"
       });
     } finally {
@@ -242,15 +316,15 @@ const AdminDashboard = () => {
   const handleSaveCertifications = async () => {
     setSaving(true);
     try {
+      await saveListSection('certifications');
       toast({
         title: "Success",
         description: "Certifications updated successfully!",
       });
-      await fetchPortfolioData();
     } catch (error) {
       toast({
         title: "Error",
-        description: "Failed to update certifications",
+        description: error.response?.data?.detail || "Failed to update certifications",
         variant: "destructive"
       });
     } finally {
@@ -261,15 +335,15 @@ const AdminDashboard = () => {
   const handleSaveSkills = async () => {
     setSaving(true);
     try {
+      await saveListSection('skills');
       toast({
         title: "Success",
         description: "Skills updated successfully!",
       });
-      await fetchPortfolioData();
     } catch (error) {
       toast({
         title: "Error",
-        description: "Failed to update skills",
+        description: error.response?.data?.detail || "Failed to update skills",
         variant: "destructive"
       });
     } finally {
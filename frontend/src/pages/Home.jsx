@@ -1,26 +1,49 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { Download, Mail, Phone, MapPin, Linkedin, Instagram, Facebook, Twitter, Award, Briefcase, Code, Loader2, Lock } from 'lucide-react';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { Progress } from '@/components/ui/progress';
-import { getPortfolio, downloadDocument } from '../services/api';
+import { getPortfolio, syncPortfolio, subscribeToEvents, downloadDocument } from '../services/api';
 import { toast } from '@/hooks/use-toast';
 
 const Home = () => {
   const navigate = useNavigate();
   const [portfolioData, setPortfolioData] = useState(null);
   const [loading, setLoading] = useState(true);
+  const portfolioRef = useRef(null);
   
   useEffect(() => {
     fetchPortfolioData();
+    // Apply edits live while the page is open
+    return subscribeToEvents((topic) => {
+      if (topic === 'portfolio') {
+        refreshPortfolioData();
+      }
+    });
   }, []);
   
+  const showPortfolio = (data) => {
+    portfolioRef.current = data;
+    setPortfolioData(data);
+  };
+  
+  const refreshPortfolioData = async () => {
+    if (!portfolioRef.current) {
+      return;
+    }
+    try {
+      showPortfolio(await syncPortfolio(portfolioRef.current));
+    } catch (error) {
+      console.error('Error refreshing portfolio:', error);
+    }
+  };
+  
   const fetchPortfolioData = async () => {
     try {
       const data = await getPortfolio();
-      setPortfolioData(data);
+      showPortfolio(data);
     } catch (error) {
       console.error('Error fetching portfolio:', error);
       toast({
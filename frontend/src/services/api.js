@@ -41,6 +41,52 @@ export const getPortfolio = async () => {
   return response.data;
 };
 
+// Changes since a portfolio version: { version, resync, changes: [...] }
+export const getPortfolioChanges = async (since) => {
+  const response = await api.get('/portfolio/changes', { params: { since } });
+  return response.data;
+};
+
+// Apply one change from the change log to a portfolio object
+const applyPortfolioChange = (portfolio, change) => {
+  const items = portfolio[change.section] || [];
+  switch (change.op) {
+    case 'set':
+      return { ...portfolio, [change.section]: change.value };
+    case 'add':
+      return { ...portfolio, [change.section]: [...items, change.value] };
+    case 'update':
+      return {
+        ...portfolio,
+        [change.section]: items.map(item => (item.id === change.id ? change.value : item))
+      };
+    case 'delete':
+      return { ...portfolio, [change.section]: items.filter(item => item.id !== change.id) };
+    default:
+      return portfolio;
+  }
+};
+
+// Bring a loaded portfolio up to date, reloading it only when the server
+// no longer has every change since its version
+export const syncPortfolio = async (portfolio) => {
+  const { version, resync, changes } = await getPortfolioChanges(portfolio.version ?? 0);
+  if (resync) {
+    return getPortfolio();
+  }
+  return { ...changes.reduce(applyPortfolioChange, portfolio), version };
+};
+
+// Call onEvent('portfolio' | 'documents') whenever that data changes on the
+// server; returns a function that closes the stream
+export const subscribeToEvents = (onEvent) => {
+  const source = new EventSource(`${API_BASE_URL}/events`);
+  ['portfolio', 'documents'].forEach(topic => {
+    source.addEventListener(topic, () => onEvent(topic));
+  });
+  return () => source.close();
+};
+
 export const downloadDocument = async (docType) => {
   const response = await api.get(`/documents/download/${docType}`, {
     responseType: 'blob',
@@ -61,6 +107,8 @@ export const verifyToken = async () => {
 };
 
 // ===== ADMIN API =====
+// Portfolio mutations resolve to the updated section (e.g. `skills`) and the
+// portfolio `version`, so callers can patch their state without refetching.
 
 export const updatePersonalInfo = async (personalInfo) => {
   const response = await api.put('/admin/portfolio/personal', personalInfo);
@@ -120,6 +168,14 @@ export const deleteSkill = async (id) => {
   return response.data;
 };
 
+// Several edits in one request: operations are { op: 'set' | 'add' |
+// 'update' | 'delete', section, id?, data? }. Resolves to per-operation
+// `results` (adds carry the new `id`), every changed section and `version`.
+export const batchUpdatePortfolio = async (operations) => {
+  const response = await api.post('/admin/portfolio/batch', { operations });
+  return response.data;
+};
+
 // Documents
 export const uploadDocuments = async (files) => {
   const formData = new FormData();
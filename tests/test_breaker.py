@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, ExecutionTimeout, OperationFailure
+
+import breaker
+from breaker import CircuitBreaker, CircuitOpenError, CLOSED, HALF_OPEN, OPEN
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def call(circuit, result=None, error=None):
+    async def operation():
+        if error is not None:
+            raise error
+        return result
+
+    return asyncio.run(circuit.call(operation))
+
+
+def trip(circuit):
+    for _ in range(circuit.failure_threshold):
+        with pytest.raises(AutoReconnect):
+            call(circuit, error=AutoReconnect("down"))
+
+
+def test_opens_after_consecutive_outage_errors(clock):
+    circuit = CircuitBreaker("mongo", failure_threshold=3, reset_seconds=10)
+    for _ in range(2):
+        with pytest.raises(AutoReconnect):
+            call(circuit, error=AutoReconnect("down"))
+    assert circuit.state == CLOSED
+
+    with pytest.raises(AutoReconnect):
+        call(circuit, error=AutoReconnect("down"))
+    assert circuit.state == OPEN
+    assert circuit.transitions[OPEN] == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    circuit = CircuitBreaker("mongo", failure_threshold=2)
+    with pytest.raises(AutoReconnect):
+        call(circuit, error=AutoReconnect("down"))
+    assert call(circuit, result="ok") == "ok"
+    with pytest.raises(AutoReconnect):
+        call(circuit, error=AutoReconnect("down"))
+    assert circuit.state == CLOSED
+
+
+def test_timeouts_count_but_query_errors_do_not(clock):
+    circuit = CircuitBreaker("mongo", failure_threshold=1)
+    with pytest.raises(OperationFailure):
+        call(circuit, error=OperationFailure("bad query", code=2))
+    assert circuit.state == CLOSED
+
+    with pytest.raises(ExecutionTimeout):
+        call(circuit, error=ExecutionTimeout("too slow", code=50))
+    assert circuit.state == OPEN
+
+
+def test_open_circuit_fails_fast(clock):
+    circuit = CircuitBreaker("mongo", failure_threshold=1, reset_seconds=10)
+    trip(circuit)
+
+    calls = []
+
+    async def operation():
+        calls.append(1)
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(circuit.call(operation))
+    assert calls == []
+    assert circuit.rejected == 1
+
+
+def test_half_open_trial_success_closes(clock):
+    circuit = CircuitBreaker("mongo", failure_threshold=1, reset_seconds=10)
+    trip(circuit)
+
+    clock[0] += 10
+    assert call(circuit, result="ok") == "ok"
+    assert circuit.state == CLOSED
+    assert circuit.transitions == {CLOSED: 1, OPEN: 1, HALF_OPEN: 1}
+
+
+def test_half_open_trial_failure_reopens(clock):
+    circuit = CircuitBreaker("mongo", failure_threshold=3, reset_seconds=10)
+    trip(circuit)
+
+    clock[0] += 10
+    with pytest.raises(AutoReconnect):
+        call(circuit, error=AutoReconnect("still down"))
+    assert circuit.state == OPEN
+    # The reset period starts over
+    clock[0] += 5
+    with pytest.raises(CircuitOpenError):
+        call(circuit, result="ok")
+
+
+def test_only_one_trial_runs_while_half_open(clock):
+    circuit = CircuitBreaker("mongo", failure_threshold=1, reset_seconds=10)
+    trip(circuit)
+    clock[0] += 10
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "ok"
+
+        trial = asyncio.create_task(circuit.call(slow))
+        await asyncio.sleep(0)
+        assert circuit.state == HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            await circuit.call(slow)
+        release.set()
+        return await trial
+
+    assert asyncio.run(scenario()) == "ok"
+    assert circuit.state == CLOSED
+
+
+def test_trial_answered_with_a_query_error_closes(clock):
+    circuit = CircuitBreaker("mongo", failure_threshold=1, reset_seconds=10)
+    trip(circuit)
+    clock[0] += 10
+    with pytest.raises(OperationFailure):
+        call(circuit, error=OperationFailure("bad query", code=2))
+    assert circuit.state == CLOSED
@@ -0,0 +1,151 @@
+import asyncio
+import copy
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from breaker import CircuitBreaker
+from cache import SnapshotCache
+
+
+class FakeCollection:
+    """The find_one of a single-document collection"""
+
+    def __init__(self, document):
+        self.document = document
+        self.error = None
+        self.loads = 0
+        self.gate = None
+
+    async def find_one(self, query, projection=None):
+        self.loads += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return copy.deepcopy(self.document)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_snapshot_is_loaded_once():
+    collection = FakeCollection({"_id": 1, "name": "a", "version": 3})
+    cache = SnapshotCache(collection, "portfolio")
+
+    first = run(cache.get())
+    second = run(cache.get())
+
+    assert first is second
+    assert first.data == {"name": "a", "version": 3}
+    assert collection.loads == 1
+    assert cache.version == 3
+
+
+def test_document_invalidated_while_loading_is_not_stored():
+    collection = FakeCollection({"name": "old"})
+    cache = SnapshotCache(collection, "portfolio")
+
+    async def scenario():
+        collection.gate = asyncio.Event()
+        load = asyncio.create_task(cache.get())
+        await asyncio.sleep(0)
+        cache.invalidate()
+        collection.gate.set()
+        return await load
+
+    assert run(scenario()).data == {"name": "old"}
+    assert cache.cached() is None
+
+
+def test_put_ignores_versions_older_than_one_already_put():
+    cache = SnapshotCache(FakeCollection({}), "portfolio")
+
+    assert cache.put({"name": "v2"}, version=2) is not None
+    assert cache.put({"name": "v1"}, version=1) is None
+    assert cache.cached().data == {"name": "v2"}
+    assert cache.version == 2
+
+
+def test_invalidate_records_the_new_version_if_known():
+    cache = SnapshotCache(FakeCollection({}), "portfolio")
+    cache.put({"name": "a"}, version=2)
+
+    cache.invalidate(version=5)
+    assert cache.version == 5
+    cache.invalidate()
+    assert cache.version is None
+
+
+def test_listeners_hear_only_about_changes():
+    cache = SnapshotCache(FakeCollection({}), "portfolio")
+    heard = []
+    cache.add_listener(lambda changed: heard.append(changed.name))
+
+    cache.invalidate(changed=False)
+    assert heard == []
+    cache.invalidate()
+    assert heard == ["portfolio"]
+
+
+def test_stale_snapshot_is_served_when_a_reload_fails():
+    collection = FakeCollection({"name": "a"})
+    cache = SnapshotCache(collection, "portfolio")
+    run(cache.get())
+
+    cache.invalidate()
+    collection.error = AutoReconnect("down")
+
+    with pytest.raises(AutoReconnect):
+        run(cache.get())
+    assert run(cache.get(stale_on_error=True)).data == {"name": "a"}
+    assert cache.stale_served == 1
+
+    # Once the database is back the fresh copy replaces it
+    collection.error = None
+    collection.document = {"name": "b"}
+    assert run(cache.get(stale_on_error=True)).data == {"name": "b"}
+
+
+def test_nothing_stale_to_serve_before_the_first_load():
+    collection = FakeCollection({"name": "a"})
+    collection.error = AutoReconnect("down")
+    cache = SnapshotCache(collection, "portfolio")
+
+    with pytest.raises(AutoReconnect):
+        run(cache.get(stale_on_error=True))
+
+
+def test_waiters_do_not_retry_a_load_that_just_failed():
+    collection = FakeCollection({"name": "a"})
+    collection.error = AutoReconnect("down")
+    cache = SnapshotCache(collection, "portfolio")
+
+    async def scenario():
+        collection.gate = asyncio.Event()
+        loads = [asyncio.create_task(cache.get()) for _ in range(3)]
+        await asyncio.sleep(0)
+        collection.gate.set()
+        return await asyncio.gather(*loads, return_exceptions=True)
+
+    results = run(scenario())
+    assert all(isinstance(result, AutoReconnect) for result in results)
+    assert collection.loads == 1
+
+
+def test_open_circuit_serves_stale_without_calling_mongo():
+    collection = FakeCollection({"name": "a"})
+    circuit = CircuitBreaker("mongo", failure_threshold=1, reset_seconds=60)
+    cache = SnapshotCache(collection, "portfolio", breaker=circuit)
+    run(cache.get())
+
+    cache.invalidate()
+    collection.error = AutoReconnect("down")
+    assert run(cache.get(stale_on_error=True)).data == {"name": "a"}
+    assert circuit.state == "open"
+
+    loads = collection.loads
+    assert run(cache.get(stale_on_error=True)).data == {"name": "a"}
+    assert collection.loads == loads
+    assert circuit.rejected == 1
@@ -0,0 +1,43 @@
+from changelog import change_log_update, changes_since
+
+LOG = [
+    {"op": "add", "section": "skills", "value": {"id": "a"}},
+    {"op": "update", "section": "skills", "id": "a", "value": {"id": "a"}},
+    {"op": "delete", "section": "skills", "id": "a"},
+]
+
+
+def test_change_log_update_bumps_version_per_change():
+    update = change_log_update(LOG[:2], size=50)
+    assert update["$inc"] == {"version": 2}
+    assert update["$push"]["changeLog"] == {"$each": LOG[:2], "$slice": -50}
+
+
+def test_changes_are_numbered_up_to_the_current_version():
+    # Versions 1-7 happened, the log keeps the last three: 5, 6 and 7
+    result = changes_since(7, LOG, since=4)
+    assert result["resync"] is False
+    assert [change["version"] for change in result["changes"]] == [5, 6, 7]
+    assert result["changes"][0]["op"] == "add"
+
+
+def test_only_changes_after_since_are_returned():
+    result = changes_since(7, LOG, since=6)
+    assert [change["version"] for change in result["changes"]] == [7]
+
+
+def test_up_to_date_client_gets_no_changes():
+    assert changes_since(7, LOG, since=7) == {"version": 7, "resync": False, "changes": []}
+
+
+def test_client_behind_the_log_must_resync():
+    assert changes_since(7, LOG, since=3)["resync"] is True
+
+
+def test_client_ahead_of_the_server_must_resync():
+    assert changes_since(7, LOG, since=8)["resync"] is True
+
+
+def test_empty_log():
+    assert changes_since(0, [], since=0) == {"version": 0, "resync": False, "changes": []}
+    assert changes_since(5, [], since=4)["resync"] is True
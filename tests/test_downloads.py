@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from downloads import file_response, http_date, parse_range
+
+CONTENT = bytes(range(256)) * 4
+ETAG = '"abc123"'
+LAST_MODIFIED = datetime(2024, 5, 1, 12, 30, 15, 250000)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 1023)),
+    ("bytes=1000-5000", (1000, 1023)),
+    ("bytes=-100", (924, 1023)),
+    ("bytes=-5000", (0, 1023)),
+    (" bytes = 5 - 9 ", (5, 9)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1024) == expected
+
+
+@pytest.mark.parametrize("header", [
+    "items=0-10",
+    "bytes=0-10,20-30",
+    "bytes=abc-",
+    "bytes=-",
+    "bytes=10",
+    "bytes=20-10",
+])
+def test_parse_range_ignores_unsupported_or_malformed(header):
+    assert parse_range(header, 1024) is None
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1024-", 1024),
+    ("bytes=-0", 1024),
+    ("bytes=-10", 0),
+])
+def test_parse_range_rejects_unsatisfiable(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(CONTENT)
+    app = FastAPI()
+
+    @app.get("/file")
+    async def serve(request: Request):
+        return await file_response(
+            request,
+            path=path,
+            filename="résumé.pdf",
+            media_type="application/pdf",
+            size=len(CONTENT),
+            etag=ETAG,
+            last_modified=LAST_MODIFIED
+        )
+
+    return TestClient(app)
+
+
+def test_missing_file_is_not_found(client, tmp_path):
+    (tmp_path / "resume.pdf").unlink()
+    response = client.get("/file")
+    assert response.status_code == 404
+
+
+def test_full_download(client):
+    response = client.get("/file")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"] == ETAG
+    assert response.headers["content-disposition"] == "attachment; filename*=utf-8''r%C3%A9sum%C3%A9.pdf"
+
+
+def test_range_request(client):
+    response = client.get("/file", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == "bytes 10-19/1024"
+    assert response.headers["content-length"] == "10"
+
+
+def test_suffix_range_request(client):
+    response = client.get("/file", headers={"Range": "bytes=-24"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[-24:]
+    assert response.headers["content-range"] == "bytes 1000-1023/1024"
+
+
+def test_unsatisfiable_range(client):
+    response = client.get("/file", headers={"Range": "bytes=2048-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */1024"
+
+
+def test_malformed_range_gets_the_whole_file(client):
+    response = client.get("/file", headers={"Range": "bytes=0-1,5-6"})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_if_range_with_current_etag_honours_the_range(client):
+    response = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": ETAG})
+    assert response.status_code == 206
+
+
+@pytest.mark.parametrize("if_range", ['"stale"', f"W/{ETAG}", http_date(LAST_MODIFIED - timedelta(days=1))])
+def test_stale_if_range_gets_the_whole_file(client, if_range):
+    response = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": if_range})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+def test_if_range_with_current_date_honours_the_range(client):
+    response = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": http_date(LAST_MODIFIED)})
+    assert response.status_code == 206
+
+
+def test_if_none_match(client):
+    assert client.get("/file", headers={"If-None-Match": ETAG}).status_code == 304
+    assert client.get("/file", headers={"If-None-Match": f'W/{ETAG}, "other"'}).status_code == 304
+    assert client.get("/file", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_modified_since(client):
+    # Last-Modified has whole seconds, so the same second counts as unmodified
+    assert client.get("/file", headers={"If-Modified-Since": http_date(LAST_MODIFIED)}).status_code == 304
+    earlier = http_date(LAST_MODIFIED - timedelta(seconds=1))
+    assert client.get("/file", headers={"If-Modified-Since": earlier}).status_code == 200
+    assert client.get("/file", headers={"If-Modified-Since": "not a date"}).status_code == 200
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since(client):
+    response = client.get("/file", headers={
+        "If-None-Match": '"other"',
+        "If-Modified-Since": http_date(LAST_MODIFIED)
+    })
+    assert response.status_code == 200
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+import ratelimit
+from ratelimit import MemoryBucketBackend, TokenBucketBackend, client_ip, parse_networks
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def consume(backend, key, capacity=2, refill_per_second=1.0):
+    return asyncio.run(backend.consume(key, capacity, refill_per_second))
+
+
+def test_burst_then_wait_for_refill(clock):
+    backend = MemoryBucketBackend()
+    assert consume(backend, "ip:a") == 0
+    assert consume(backend, "ip:a") == 0
+    assert consume(backend, "ip:a") == pytest.approx(1.0)
+
+    clock[0] += 0.5
+    assert consume(backend, "ip:a") == pytest.approx(0.5)
+
+    clock[0] += 0.5
+    assert consume(backend, "ip:a") == 0
+
+
+def test_refill_is_capped_at_capacity(clock):
+    backend = MemoryBucketBackend()
+    consume(backend, "ip:a")
+    clock[0] += 3600
+    assert consume(backend, "ip:a") == 0
+    assert consume(backend, "ip:a") == 0
+    assert consume(backend, "ip:a") > 0
+
+
+def test_least_recently_used_key_is_evicted(clock):
+    backend = MemoryBucketBackend(max_keys=2)
+    for _ in range(2):
+        consume(backend, "ip:a")
+    consume(backend, "ip:b")
+    # Touch b again so a is the least recently used
+    consume(backend, "ip:b")
+    consume(backend, "ip:c")
+
+    assert list(backend._buckets) == ["ip:b", "ip:c"]
+    # An evicted key starts over with a full bucket
+    assert consume(backend, "ip:a") == 0
+
+
+def test_backend_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        TokenBucketBackend()
+
+
+TRUSTED = parse_networks("10.0.0.0/8, 127.0.0.1")
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers():
+    assert client_ip("203.0.113.5", "198.51.100.1", TRUSTED) == "203.0.113.5"
+
+
+def test_client_is_the_first_untrusted_hop_from_the_right():
+    # The client spoofed 1.1.1.1; the proxy appended the real address
+    assert client_ip("10.0.0.2", "1.1.1.1, 198.51.100.7", TRUSTED) == "198.51.100.7"
+    assert client_ip("10.0.0.2", "198.51.100.7, 10.0.0.9", TRUSTED) == "198.51.100.7"
+
+
+def test_peer_is_used_without_a_usable_header():
+    assert client_ip("10.0.0.2", None, TRUSTED) == "10.0.0.2"
+    assert client_ip("10.0.0.2", "10.0.0.3", TRUSTED) == "10.0.0.2"
+    assert client_ip(None, "198.51.100.7", TRUSTED) is None
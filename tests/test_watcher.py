@@ -0,0 +1,54 @@
+import asyncio
+
+from cache import SnapshotCache
+from watcher import UNSEEN, CacheWatcher
+
+
+class FakeCollection:
+    """The find_one of a single-document collection"""
+
+    def __init__(self, document):
+        self.document = document
+
+    async def find_one(self, query, projection=None):
+        return dict(self.document)
+
+
+def check(cache, last_seen):
+    return asyncio.run(CacheWatcher([cache])._check(cache, last_seen))
+
+
+def test_own_write_keeps_the_post_image():
+    collection = FakeCollection({"name": "new", "version": 4, "updatedAt": 2})
+    cache = SnapshotCache(collection, "portfolio")
+    cache.put({"name": "new", "version": 4}, version=4)
+
+    assert check(cache, 1) == 2
+    assert cache.cached() is not None
+
+
+def test_write_by_another_worker_invalidates():
+    collection = FakeCollection({"name": "new", "version": 5, "updatedAt": 2})
+    cache = SnapshotCache(collection, "portfolio")
+    cache.put({"name": "old", "version": 4}, version=4)
+    changes = []
+    cache.add_listener(changes.append)
+
+    check(cache, 1)
+
+    assert cache.cached() is None
+    assert cache.version == 5
+    assert changes == [cache]
+
+
+def test_unversioned_document_is_invalidated():
+    collection = FakeCollection({"resume-pdf": {}, "updatedAt": 2})
+    cache = SnapshotCache(collection, "documents")
+    cache.put({"resume-pdf": {}})
+    changes = []
+    cache.add_listener(changes.append)
+
+    check(cache, UNSEEN)
+
+    assert cache.cached() is None
+    assert changes == []